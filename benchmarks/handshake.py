@@ -0,0 +1,87 @@
+"""CPU time of the client side handshake work when many entries reconnect at once
+
+    python benchmarks/handshake.py [entries]
+
+every entry binds a protocol and completes a password handshake requested by a hub, like
+a reconnect: HELLO, the hub asking for a password handshake, the client envelope and the
+hub envelope. "library" is HiveMindSlaveProtocol, "cached" is HiveMindHAProtocol which
+parses the RSA PEM once per process and derives the session key once per handshake salt
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from Cryptodome.PublicKey import RSA
+from hivemind_bus_client.message import HiveMessage, HiveMessageType
+from hivemind_bus_client.protocol import HiveMindSlaveProtocol
+from ovos_utils.fakebus import FakeBus
+from poorman_handshake import PasswordHandShake
+
+HANDSHAKE_PATH = os.path.join(os.path.dirname(__file__), "..", "custom_components", "hivemind", "handshake.py")
+spec = importlib.util.spec_from_file_location("hivemind_handshake", HANDSHAKE_PATH)
+handshake = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(handshake)
+
+PASSWORD = "password"
+
+
+class FakeHub:
+    """the parts of HiveMessageBusClient the protocol uses, emitted messages are kept"""
+
+    def __init__(self, identity):
+        self.identity = identity
+        self.session_id = "default"
+        self.crypto_key = None
+        self.json_encoding = None
+        self.cipher = None
+        self.handshake_event = SimpleNamespace(set=lambda: None)
+        self.sent = []
+
+    def on(self, event_name, func):
+        pass
+
+    def emit(self, message):
+        self.sent.append(message)
+
+
+def reconnect(protocol_class, pem_path: str) -> type:
+    """Run one handshake, returns the password handshake class the protocol ended up with"""
+    identity = SimpleNamespace(private_key=pem_path, password=PASSWORD, public_key="")
+    hub = FakeHub(identity)
+    protocol = protocol_class(hm=hub, identity=identity)
+    protocol.bind(FakeBus())
+    protocol.handle_handshake(HiveMessage(HiveMessageType.HANDSHAKE, {"password": True, "binarize": False}))
+    master = PasswordHandShake(PASSWORD)
+    envelope = master.generate_handshake()
+    master.receive_handshake(hub.sent[-1].payload["envelope"])
+    protocol.handle_handshake(HiveMessage(HiveMessageType.HANDSHAKE, {"envelope": envelope}))
+    assert hub.crypto_key == master.secret
+    return type(protocol.pswd_handshake)
+
+
+def measure(protocol_class, entries: int, pem_path: str) -> tuple:
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(entries):
+        used = reconnect(protocol_class, pem_path)
+    return time.process_time() - cpu, time.perf_counter() - wall, used.__name__
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with tempfile.TemporaryDirectory() as tmp:
+        pem_path = os.path.join(tmp, "identity.pem")
+        with open(pem_path, "wb") as f:
+            f.write(RSA.generate(2048).export_key(format="PEM"))
+        print(f"handshakes for {entries} entries")
+        print(f"{'path':<8} {'cpu s':>8} {'wall s':>8} {'cpu ms/entry':>13}  password handshake")
+        for name, protocol_class in (("library", HiveMindSlaveProtocol),
+                                     ("cached", handshake.HiveMindHAProtocol)):
+            cpu, wall, used = measure(protocol_class, entries, pem_path)
+            print(f"{name:<8} {cpu:>8.3f} {wall:>8.3f} {cpu * 1000 / entries:>13.1f}  {used}")
+
+
+if __name__ == "__main__":
+    main()
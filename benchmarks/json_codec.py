@@ -0,0 +1,74 @@
+"""Compare the stdlib json module with the HiveMind codec on typical bus traffic
+
+    python benchmarks/json_codec.py [iterations]
+
+reports encode/decode throughput and the memory allocated per message
+"""
+import importlib.util
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+CODEC_PATH = os.path.join(os.path.dirname(__file__), "..", "custom_components", "hivemind", "codec.py")
+spec = importlib.util.spec_from_file_location("hivemind_codec", CODEC_PATH)
+codec = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(codec)
+
+CONTEXT = {"source": "HomeAssistantV0.0.2", "platform": "HomeAssistantV0.0.2", "destination": "HiveMind",
+           "session": {"session_id": "4f6c0b8e9a2d4c51b3a7e0d1f2c3b4a5", "site_id": "living_room"}}
+MESSAGES = {
+    "playback_time": {"msg_type": "bus", "payload": {"type": "ovos.common_play.playback_time",
+                                                     "data": {"position": 123456, "length": 245000},
+                                                     "context": CONTEXT},
+                      "metadata": {}, "route": [], "node": None, "target_site_id": None,
+                      "target_pubkey": None, "source_peer": None},
+    "track_info": {"msg_type": "bus", "payload": {"type": "ovos.common_play.track_info.response",
+                                                  "data": {"title": "Sinfonía nº 9 – Allegro", "artist": "Dvořák",
+                                                           "album": "From the New World", "duration": 245,
+                                                           "image": "https://example.com/cover.jpg",
+                                                           "uri": "file:///media/music/dvorak/09.flac",
+                                                           "playlist": [{"title": f"track {i}", "length": i * 1000}
+                                                                        for i in range(20)]},
+                                                  "context": CONTEXT},
+                   "metadata": {}, "route": [], "node": None, "target_site_id": None,
+                   "target_pubkey": None, "source_peer": None},
+}
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def bench(func, arg, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [func(arg) for _ in range(100)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename")) / 100
+    del results
+    return iterations / elapsed, allocated
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    backend = "orjson" if codec.orjson is not None else "stdlib fallback"
+    print(f"codec backend: {backend}, {iterations} iterations")
+    print(f"{'message':<14} {'op':<7} {'impl':<7} {'msg/s':>12} {'bytes/msg':>10}")
+    for name, message in MESSAGES.items():
+        raw = stdlib_dumps(message)
+        for op, impls, arg in (("encode", (("stdlib", stdlib_dumps), ("codec", codec.json_dumps)), message),
+                               ("decode", (("stdlib", json.loads), ("codec", codec.json_loads)), raw)):
+            for impl, func in impls:
+                rate, allocated = bench(func, arg, iterations)
+                print(f"{name:<14} {op:<7} {impl:<7} {rate:>12,.0f} {allocated:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Count socket writes and receiver wakeups for a poll burst, one write per message vs coalesced
+
+    python benchmarks/socket_writes.py [messages per burst] [bursts]
+
+the per message path is websocket-client's WebSocket.send, as used by the library client,
+the coalesced path frames every message individually and joins the frames of a batch
+into one write, as OutboundSender does
+"""
+import selectors
+import socket
+import sys
+import threading
+import time
+
+from websocket import ABNF, WebSocket
+
+# what HiveMindMediaPlayer.async_update queues in one tick, roughly sized like encrypted messages
+POLL_TYPES = ["mycroft.volume.get", "ovos.common_play.track_info", "ovos.common_play.get_track_length",
+              "ovos.common_play.get_track_position", "ovos.common_play.player.status"]
+
+
+class CountingSocket(socket.socket):
+    """The socket websocket-client writes to, counting its send calls
+
+    every send() on a socket.socket is one send syscall, so this counts the writes that
+    reach the kernel, including the retries websocket-client does after a partial write.
+    On Linux ``strace -f -c -e trace=sendto python benchmarks/socket_writes.py`` shows the same
+    """
+    sends = 0
+
+    def send(self, data, flags: int = 0) -> int:
+        self.sends += 1
+        return super().send(data, flags)
+
+
+def drain(sock: socket.socket, expected: int, result: dict):
+    """Read until ``expected`` bytes arrived, counting the reads that woke the receiver"""
+    sel = selectors.DefaultSelector()
+    sel.register(sock, selectors.EVENT_READ)
+    received = wakeups = 0
+    while received < expected:
+        sel.select()
+        wakeups += 1
+        received += len(sock.recv(1 << 20))
+    result["wakeups"] = wakeups
+
+
+def make_ws(sock: socket.socket) -> WebSocket:
+    ws = WebSocket()
+    ws.sock = CountingSocket(fileno=sock.detach())
+    ws.connected = True
+    return ws
+
+
+def payloads(burst: int):
+    return [f'{{"ciphertext": "{"x" * 180}", "tag": "{"y" * 24}", "nonce": "{POLL_TYPES[i % 5]}"}}'
+            for i in range(burst)]
+
+
+def run(burst: int, bursts: int, coalesce: bool) -> dict:
+    a, b = socket.socketpair()
+    ws = make_ws(a)
+    messages = payloads(burst)
+    frame_size = sum(len(ABNF.create_frame(m, ABNF.OPCODE_TEXT).format()) for m in messages)
+    result = {}
+    reader = threading.Thread(target=drain, args=(b, frame_size * bursts, result))
+    reader.start()
+    start = time.perf_counter()
+    for _ in range(bursts):
+        if coalesce:
+            frames = [ABNF.create_frame(m, ABNF.OPCODE_TEXT).format() for m in messages]
+            data = memoryview(b"".join(frames))
+            with ws.lock:
+                while data:
+                    data = data[ws._send(data):]
+        else:
+            for m in messages:
+                ws.send(m)
+        # give the receiver a chance to wake up between bursts, like polls a few seconds apart
+        time.sleep(0.001)
+    reader.join()
+    elapsed = time.perf_counter() - start
+    sends = ws.sock.sends
+    ws.sock.close()
+    b.close()
+    return {"sends": sends, "wakeups": result["wakeups"], "elapsed": elapsed}
+
+
+def main():
+    burst = int(sys.argv[1]) if len(sys.argv) > 1 else len(POLL_TYPES)
+    bursts = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    print(f"{bursts} bursts of {burst} messages")
+    print(f"{'path':<12} {'send calls':>10} {'per burst':>10} {'rx wakeups':>11} {'seconds':>8}")
+    for name, coalesce in (("per message", False), ("coalesced", True)):
+        r = run(burst, bursts, coalesce)
+        print(f"{name:<12} {r['sends']:>10} {r['sends'] / bursts:>10.1f} {r['wakeups']:>11} {r['elapsed']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,36 @@
 """Send notifications to HiveMind devices"""
 
 import os
+from datetime import timedelta
+from functools import partial
 
-from hivemind_bus_client.client import HiveMessageBusClient
 from hivemind_bus_client.identity import NodeIdentity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 from json_database import JsonStorage
 from ovos_utils.fakebus import FakeBus
 from ovos_utils.log import LOG, init_service_logger
-from .const import DOMAIN
+from .assist import AssistAudioBridge
+from .client import HiveMindClient
+from .const import (DOMAIN, PLATFORMS, CONF_FORWARD_EVENTS, CONF_FORWARD_RATE_LIMIT,
+                    DEFAULT_FORWARD_EVENTS, DEFAULT_FORWARD_RATE_LIMIT, CONF_STALL_THRESHOLD,
+                    DATA_REQUEST_LIMITER)
+from .events import BusEventBridge, parse_patterns
+from .latency import EXPIRE_INTERVAL
+from .metrics import HiveMindMetricsView
+from .polling import DevicePoller, RequestLimiter
+from .services import async_setup_services
+from .stalls import StallDetector
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-async def get_bus(entry) -> HiveMessageBusClient:
+
+async def get_bus(entry) -> HiveMindClient:
     # Get config values
     key = entry.data["access_key"]
     password = entry.data["password"]
@@ -22,14 +40,21 @@ async def get_bus(entry) -> HiveMessageBusClient:
     ovos_bus = FakeBus() # explicitly passed so we use "default" session, otherwise HM assigns random session_id
     ovos_bus.session_id = entry.data.get("session_id", "default")
     identity_file = JsonStorage(f"{os.path.dirname(__file__)}/_identity.json")
-    return HiveMessageBusClient(key=key,
-                                password=password,
-                                port=port,
-                                host=host,
-                                useragent="HomeAssistantV0.0.2",
-                                self_signed=self_signed,
-                                internal_bus=ovos_bus,
-                                identity=NodeIdentity(identity_file))
+    return HiveMindClient(key=key,
+                          password=password,
+                          port=port,
+                          host=host,
+                          useragent="HomeAssistantV0.0.2",
+                          self_signed=self_signed,
+                          internal_bus=ovos_bus,
+                          identity=NodeIdentity(identity_file))
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    await async_setup_services(hass)
+    hass.http.register_view(HiveMindMetricsView())
+    hass.data[DATA_REQUEST_LIMITER] = RequestLimiter(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -38,8 +63,65 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = entry
 
     entry.hm_bus = await get_bus(entry)
-
-    entry.hm_bus.connect(site_id=entry.data.get("site_id", "unknown"))
-    await hass.config_entries.async_forward_entry_setups(entry, ["notify", "binary_sensor",  "sensor",
-                                                                 "button", "media_player", "switch", "select"])
+    try:
+        await _async_start_bus(hass, entry)
+    except Exception as e:
+        # the client owns a sender thread and bus handlers from the moment it is created
+        await _async_release_bus(hass, entry)
+        raise ConfigEntryNotReady(f"Could not connect to HiveMind: {e}") from e
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
+
+
+async def _async_start_bus(hass: HomeAssistant, entry: ConfigEntry):
+    if entry.options.get(CONF_STALL_THRESHOLD):
+        entry.hm_bus.stats.stalls = StallDetector(entry.options[CONF_STALL_THRESHOLD] / 1000)
+
+    patterns = parse_patterns(entry.options.get(CONF_FORWARD_EVENTS, DEFAULT_FORWARD_EVENTS))
+    entry.hm_event_bridge = BusEventBridge(hass, entry.entry_id,
+                                           site_id=entry.data.get("site_id", "unknown"),
+                                           patterns=patterns,
+                                           rate=entry.options.get(CONF_FORWARD_RATE_LIMIT,
+                                                                  DEFAULT_FORWARD_RATE_LIMIT))
+    if entry.hm_event_bridge.filter:
+        entry.hm_bus.bus_listeners.append(entry.hm_event_bridge)
+    entry.hm_assist = AssistAudioBridge(hass, entry.hm_bus)
+    entry.hm_bus.audio_handler = entry.hm_assist.handle_audio
+    entry.hm_bus.poller = DevicePoller(hass, entry.hm_bus, hass.data[DATA_REQUEST_LIMITER])
+
+    await hass.async_add_executor_job(partial(entry.hm_bus.connect,
+                                              site_id=entry.data.get("site_id", "unknown")))
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Assist runs are attributed to the device registered by the platforms
+    devices = dr.async_entries_for_config_entry(dr.async_get(hass), entry.entry_id)
+    if devices:
+        entry.hm_assist.device_id = devices[0].id
+    # the handshake above completed before any entity was added
+    entry.hm_bus.poller.async_start()
+    # unconfirmed commands count as failed even while no latency sensor is enabled
+    latency = entry.hm_bus.latency
+    entry.async_on_unload(async_track_time_interval(
+        hass, lambda now: latency.expire(), timedelta(seconds=EXPIRE_INTERVAL)))
+
+
+async def _async_release_bus(hass: HomeAssistant, entry: ConfigEntry):
+    """Stop the connection of an entry and drop every runtime object attached to it"""
+    bus = entry.hm_bus
+    if bus.poller is not None:
+        bus.poller.shutdown()
+    await hass.async_add_executor_job(bus.shutdown)
+    hass.data[DOMAIN].pop(entry.entry_id, None)
+    for attr in ("hm_bus", "hm_event_bridge", "hm_assist"):
+        if hasattr(entry, attr):
+            delattr(entry, attr)
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        await _async_release_bus(hass, entry)
+    return unload_ok
@@ -0,0 +1,150 @@
+"""Stream satellite microphone audio into Home Assistant Assist pipelines"""
+import asyncio
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import AsyncIterator, Dict, Optional
+
+from homeassistant.components import assist_pipeline, stt
+from homeassistant.core import Context, HomeAssistant
+from ovos_bus_client.message import Message
+
+_LOGGER = logging.getLogger(__name__)
+
+AUDIO_QUEUE_SIZE = 64  # chunks buffered per stream, newer ones are dropped while it is full
+AUDIO_IDLE_TIMEOUT = 3  # seconds without audio before a stream is considered finished
+FINISHED_STREAMS = 64  # finished stream ids remembered so late frames do not start a new run
+
+
+class AudioStream:
+    """Bounded buffer of raw audio chunks for one satellite utterance, used on the event loop"""
+
+    def __init__(self, stream_id: str, metadata: dict):
+        self.stream_id = stream_id
+        self.metadata = metadata
+        self.queue: asyncio.Queue = asyncio.Queue(AUDIO_QUEUE_SIZE)
+        self.closed = False  # no more chunks are accepted
+        self.dropped = 0
+
+    def put(self, chunk: bytes):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(chunk)
+        except asyncio.QueueFull:
+            if not self.dropped:
+                _LOGGER.warning(f"Assist pipeline is not consuming audio stream {self.stream_id}, dropping chunks")
+            self.dropped += 1
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if not self.queue.full():
+            # wakes a waiting consumer, a full queue ends once drained
+            self.queue.put_nowait(None)
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        while not (self.closed and self.queue.empty()):
+            try:
+                chunk = await asyncio.wait_for(self.queue.get(), AUDIO_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                _LOGGER.debug(f"Audio stream {self.stream_id} timed out")
+                return
+            if chunk is None:
+                return
+            yield chunk
+
+
+class AssistAudioBridge:
+    """Feed RAW_AUDIO binary messages from a HiveMind connection into Assist
+
+    every stream_id in the message metadata is one pipeline run, ended by a message
+    with ``end`` set in its metadata or by a pause in the audio. Frames arriving for
+    a stream_id that already finished are dropped.
+    Chunks are handed over to the event loop as received, without copies, the client
+    thread never waits for the pipeline: a stream AUDIO_QUEUE_SIZE chunks behind drops
+    new chunks instead of stalling every other message of the connection
+    """
+
+    def __init__(self, hass: HomeAssistant, bus, device_id: Optional[str] = None):
+        self.hass = hass
+        self.bus = bus
+        self.device_id = device_id
+        self._streams: Dict[str, AudioStream] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()  # bounded set of finished stream ids
+        self._lock = Lock()  # streams start on the client thread and finish on both threads
+
+    @property
+    def active_streams(self) -> int:
+        with self._lock:
+            return len(self._streams)
+
+    def handle_audio(self, chunk: bytes, metadata: dict):
+        """Called from the HiveMind client thread for every RAW_AUDIO message"""
+        stream_id = metadata.get("stream_id", "default")
+        with self._lock:
+            if stream_id in self._finished:
+                return
+            stream = self._streams.get(stream_id)
+            started = stream is None
+            if started:
+                if not chunk:
+                    # a trailing end frame, nothing to transcribe
+                    return
+                stream = self._streams[stream_id] = AudioStream(stream_id, metadata)
+        if started:
+            asyncio.run_coroutine_threadsafe(self._run_pipeline(stream), self.hass.loop)
+        if chunk:
+            self.hass.loop.call_soon_threadsafe(stream.put, chunk)
+        if metadata.get("end"):
+            self._finish(stream)
+            self.hass.loop.call_soon_threadsafe(stream.close)
+
+    def _finish(self, stream: AudioStream):
+        with self._lock:
+            if self._streams.get(stream.stream_id) is stream:
+                self._streams.pop(stream.stream_id)
+            if stream.stream_id != "default":
+                # without a stream_id every utterance shares "default", it can not be told apart
+                self._finished[stream.stream_id] = None
+                while len(self._finished) > FINISHED_STREAMS:
+                    self._finished.popitem(last=False)
+
+    async def _run_pipeline(self, stream: AudioStream):
+        metadata = stream.metadata
+        stt_metadata = stt.SpeechMetadata(
+            language=metadata.get("lang") or self.hass.config.language,
+            format=stt.AudioFormats.WAV,
+            codec=stt.AudioCodecs.PCM,
+            bit_rate=metadata.get("sample_width", 2) * 8,
+            sample_rate=metadata.get("sample_rate", 16000),
+            channel=metadata.get("channels", 1)
+        )
+        try:
+            await assist_pipeline.async_pipeline_from_audio_stream(
+                self.hass,
+                context=Context(),
+                event_callback=self._handle_pipeline_event,
+                stt_metadata=stt_metadata,
+                stt_stream=stream.chunks(),
+                device_id=self.device_id,
+                start_stage=assist_pipeline.PipelineStage.STT,
+                end_stage=assist_pipeline.PipelineStage.INTENT
+            )
+        except Exception as e:
+            _LOGGER.error(f"Assist pipeline failed for audio stream {stream.stream_id}: {e}")
+        finally:
+            # STT may finish before the satellite stops streaming, later chunks are dropped
+            stream.closed = True
+            while not stream.queue.empty():
+                stream.queue.get_nowait()
+            self._finish(stream)
+
+    def _handle_pipeline_event(self, event: assist_pipeline.PipelineEvent):
+        if event.type != assist_pipeline.PipelineEventType.INTENT_END or not event.data:
+            return
+        response = event.data["intent_output"]["response"]
+        speech = response.get("speech", {}).get("plain", {}).get("speech")
+        if speech:
+            self.bus.emit_mycroft(Message("speak", {"utterance": speech}))
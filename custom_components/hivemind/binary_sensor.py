@@ -1,27 +1,24 @@
 """HiveMind notification platform."""
 import logging
+from typing import List
 
 from ovos_bus_client.message import Message
 from hivemind_bus_client.client import HiveMessageBusClient
 from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.const import STATE_ON
+from homeassistant.core import HomeAssistant, State
 
-from .const import DOMAIN
+from .device_state import HEALTH_SERVICES
+from .entity import HiveMindEntity
+from .polling import HEALTH_POLL_INTERVAL
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class HiveMindConnectionSensor(BinarySensorEntity):
+class HiveMindConnectionSensor(HiveMindEntity, BinarySensorEntity):
     """Binary Sensor for HiveMind connection status."""
 
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-
     @property
     def name(self):
         """Name of the entity."""
@@ -32,19 +29,6 @@ class HiveMindConnectionSensor(BinarySensorEntity):
         """Return a unique ID for this entity."""
         return f"hm-connection-status-{self._name}-{self.site_id}".replace(" ", "")
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def is_on(self) -> bool:
         """Return the status of the binary sensor (True if connected)."""
@@ -62,23 +46,13 @@ class HiveMindConnectionSensor(BinarySensorEntity):
         return "mdi:lan-disconnect"
 
 
-class HiveMindSpeakingSensor(BinarySensorEntity):
+class HiveMindSpeakingSensor(HiveMindEntity, BinarySensorEntity):
     """Binary Sensor for HiveMind connection status."""
+    state_fields = ("speaking",)
 
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-        self._is_speaking = False
-        self.bus.on_mycroft("mycroft.audio.is_speaking", self.handle_update)
-
-    def handle_update(self, message: Message):
-        self._is_speaking = message.data.get("speaking", False)
-        self.schedule_update_ha_state()
-
-    async def async_update(self):
-        self.bus.emit_mycroft(Message("mycroft.audio.speak.status"))
+    def poll_messages(self) -> List[Message]:
+        # not restored, speech in progress before a restart is over
+        return [Message("mycroft.audio.speak.status")]
 
     @property
     def name(self):
@@ -90,23 +64,10 @@ class HiveMindSpeakingSensor(BinarySensorEntity):
         """Return a unique ID for this entity."""
         return f"hm-speaking-status-{self._name}-{self.site_id}".replace(" ", "")
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def is_on(self) -> bool:
         """Return the status of the binary sensor (True if TTS executing)."""
-        return self._is_speaking
+        return self.bus.device_state["speaking"]
 
     @property
     def device_class(self) -> BinarySensorDeviceClass:
@@ -125,15 +86,21 @@ class HiveMindAliveSensor(HiveMindConnectionSensor):
     def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, proc_name: str, **kwargs) -> None:
         super().__init__(bus, site_id, name, **kwargs)
         self._proc_name = proc_name
-        self._alive = False
-        self.bus.on_mycroft(f"mycroft.{self._proc_name}.is_alive.response", self.handle_update)
+        self.state_fields = (f"alive:{proc_name}", f"missing:{proc_name}")
 
-    def handle_update(self, message: Message):
-        self._alive = message.data.get("status", False)
-        self.schedule_update_ha_state()
+    def poll_messages(self) -> List[Message]:
+        return [Message(f"mycroft.{self._proc_name}.is_alive")]
 
-    async def async_update(self):
-        self.bus.emit_mycroft(Message(f"mycroft.{self._proc_name}.is_alive"))
+    @property
+    def poll_interval(self) -> float:
+        if self.bus.device_state[f"missing:{self._proc_name}"]:
+            return self.bus.health.interval(self._proc_name)
+        if self.is_on:
+            return HEALTH_POLL_INTERVAL
+        return super().poll_interval
+
+    def restored_fields(self, state: State) -> dict:
+        return {f"alive:{self._proc_name}": state.state == STATE_ON}
 
     @property
     def name(self):
@@ -159,12 +126,13 @@ class HiveMindAliveSensor(HiveMindConnectionSensor):
 
     @property
     def available(self) -> bool:
-        return self.bus.handshake_event.is_set()
+        # unavailable while the service does not answer, e.g. not installed
+        return self.bus.handshake_event.is_set() and not self.bus.device_state[f"missing:{self._proc_name}"]
 
     @property
     def is_on(self) -> bool:
         """Return the status of the binary sensor (True if service alive)."""
-        return self._alive
+        return self.bus.device_state[f"alive:{self._proc_name}"]
 
     @property
     def device_class(self) -> BinarySensorDeviceClass:
@@ -183,15 +151,21 @@ class HiveMindReadySensor(HiveMindConnectionSensor):
     def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, proc_name: str, **kwargs) -> None:
         super().__init__(bus, site_id, name, **kwargs)
         self._proc_name = proc_name
-        self._ready = False
-        self.bus.on_mycroft(f"mycroft.{self._proc_name}.is_ready.response", self.handle_update)
+        self.state_fields = (f"ready:{proc_name}", f"missing:{proc_name}")
 
-    def handle_update(self, message: Message):
-        self._ready = message.data.get("status", False)
-        self.schedule_update_ha_state()
+    def poll_messages(self) -> List[Message]:
+        return [Message(f"mycroft.{self._proc_name}.is_ready")]
 
-    async def async_update(self):
-        self.bus.emit_mycroft(Message(f"mycroft.{self._proc_name}.is_ready"))
+    @property
+    def poll_interval(self) -> float:
+        if self.bus.device_state[f"missing:{self._proc_name}"]:
+            return self.bus.health.interval(self._proc_name)
+        if self.is_on:
+            return HEALTH_POLL_INTERVAL
+        return super().poll_interval
+
+    def restored_fields(self, state: State) -> dict:
+        return {f"ready:{self._proc_name}": state.state == STATE_ON}
 
     @property
     def name(self):
@@ -217,12 +191,13 @@ class HiveMindReadySensor(HiveMindConnectionSensor):
 
     @property
     def available(self) -> bool:
-        return self.bus.handshake_event.is_set()
+        # unavailable while the service does not answer, e.g. not installed
+        return self.bus.handshake_event.is_set() and not self.bus.device_state[f"missing:{self._proc_name}"]
 
     @property
     def is_on(self) -> bool:
         """Return the status of the binary sensor (True if service ready)."""
-        return self._ready
+        return self.bus.device_state[f"ready:{self._proc_name}"]
 
     @property
     def device_class(self) -> BinarySensorDeviceClass:
@@ -258,7 +233,7 @@ async def async_setup_entry(
         site_id=site_id
     )
     sensors = [connection_sensor, spk]
-    for proc in ["skills", "audio", "voice", "PHAL", "gui_service"]:
+    for proc in HEALTH_SERVICES:
         alive_sensor = HiveMindAliveSensor(
             bus=entry.hm_bus,
             name=name,
@@ -1,39 +1,18 @@
 """HiveMind notification platform."""
 import logging
 from ovos_bus_client.message import Message
-from hivemind_bus_client.client import HiveMessageBusClient
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
 
-from .const import DOMAIN
+from .entity import HiveMindEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class HiveMindConnectionButton(ButtonEntity):
+class HiveMindConnectionButton(HiveMindEntity, ButtonEntity):
     """Button for reconnecting to HiveMind."""
 
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -60,32 +39,13 @@ class HiveMindConnectionButton(ButtonEntity):
     def icon(self) -> str | None:
         return "mdi:dots-hexagon"
 
-class HiveMindSystemRebootButton(ButtonEntity):
+class HiveMindSystemRebootButton(HiveMindEntity, ButtonEntity):
     """Button for rebooting the device via ovos-PHAL-plugin-system"""
 
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-
     @property
     def available(self) -> bool:
         return self.bus.handshake_event.is_set()
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -105,32 +65,13 @@ class HiveMindSystemRebootButton(ButtonEntity):
     def icon(self) -> str | None:
         return "mdi:restart-alert"
 
-class HiveMindSystemShutdownButton(ButtonEntity):
+class HiveMindSystemShutdownButton(HiveMindEntity, ButtonEntity):
     """Button for shutting down the device via ovos-PHAL-plugin-system"""
 
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-
     @property
     def available(self) -> bool:
         return self.bus.handshake_event.is_set()
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -150,32 +91,13 @@ class HiveMindSystemShutdownButton(ButtonEntity):
     def icon(self) -> str | None:
         return "mdi:power"
 
-class HiveMindRestartButton(ButtonEntity):
+class HiveMindRestartButton(HiveMindEntity, ButtonEntity):
     """Button for restarting OVOS via ovos-PHAL-plugin-system"""
 
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-
     @property
     def available(self) -> bool:
         return self.bus.handshake_event.is_set()
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -196,28 +118,9 @@ class HiveMindRestartButton(ButtonEntity):
     def icon(self) -> str | None:
         return "mdi:restart"
 
-class HiveMindMicListenButton(ButtonEntity):
+class HiveMindMicListenButton(HiveMindEntity, ButtonEntity):
     """Button for triggering microphone listening in HiveMind device."""
 
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -239,28 +142,9 @@ class HiveMindMicListenButton(ButtonEntity):
 
 
 
-class HiveMindStopButton(ButtonEntity):
+class HiveMindStopButton(HiveMindEntity, ButtonEntity):
     """Button for sending a stop signal to HiveMind device."""
 
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -0,0 +1,114 @@
+"""Record and replay HiveMind bus traffic"""
+import queue
+import threading
+import time
+from typing import Union
+
+from hivemind_bus_client.message import HiveMessage, HiveMessageType
+from ovos_bus_client.message import Message
+from ovos_utils.log import LOG
+
+from .codec import json_dumps, json_loads
+
+CAPTURE_INBOUND = "in"
+CAPTURE_OUTBOUND = "out"
+CAPTURE_QUEUE_SIZE = 1000  # messages waiting for the disk before new ones are dropped
+
+
+def message_record(message: Union[HiveMessage, Message]) -> dict:
+    """JSON safe representation of a message, binary payloads are reduced to their size"""
+    if isinstance(message, Message):
+        message = HiveMessage(HiveMessageType.BUS, message)
+    if message.msg_type == HiveMessageType.BINARY:
+        # binary payloads are not replayable, only keep track of their size
+        return {"msg_type": message.msg_type,
+                "bin_type": int(message.bin_type),
+                "size": len(message.payload)}
+    return message.as_dict
+
+
+class BusCapture:
+    """Write HiveMind messages to a JSONL file from a background thread
+
+    Each line is a compact ``[timestamp, direction, message]`` list. Messages are encoded
+    when recorded, so later changes to their data are not captured, disk I/O never happens
+    on the thread that recorded the message. When the disk falls behind by
+    ``CAPTURE_QUEUE_SIZE`` messages new ones are dropped and counted
+    """
+
+    def __init__(self, path: str, size: int = CAPTURE_QUEUE_SIZE):
+        self.path = path
+        self.count = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=size)
+        self._thread = threading.Thread(target=self._run, name="hivemind-capture", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Messages recorded but not yet written to disk"""
+        return self._queue.qsize()
+
+    def record(self, direction: str, message: Union[HiveMessage, Message]):
+        ts = time.time()
+        try:
+            record = json_dumps(message_record(message))
+        except Exception as e:
+            LOG.error(f"Failed to capture HiveMind message: {e}")
+            return
+        try:
+            self._queue.put_nowait((ts, direction, record))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                ts, direction, record = item
+                f.write(f'[{round(ts, 6)}, "{direction}", {record}]\n')
+                self.count += 1
+                if self._queue.empty():
+                    f.flush()
+        LOG.info(f"HiveMind capture closed: {self.path} ({self.count} messages, {self.dropped} dropped)")
+
+    def as_dict(self) -> dict:
+        return {"path": self.path,
+                "written": self.count,
+                "pending": self.pending,
+                "dropped": self.dropped}
+
+
+def replay_capture(path: str, bus, speed: float = 1.0) -> int:
+    """Feed the inbound bus messages of a capture file to ``bus`` as if the device sent them again
+
+    speed is a multiplier of the original timing, 0 replays as fast as possible
+
+    Returns the number of messages replayed
+    """
+    count = 0
+    t0 = start = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            ts, direction, data = json_loads(line)
+            # only bus messages reach the entity handlers
+            if direction != CAPTURE_INBOUND or data.get("msg_type") != HiveMessageType.BUS:
+                continue
+            if speed > 0:
+                if t0 is None:
+                    t0, start = ts, time.monotonic()
+                delay = (ts - t0) / speed - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            # through the client inbound path, so stats, latency, health and listeners see it too
+            bus.on_message(json_dumps(data))
+            count += 1
+    return count
@@ -0,0 +1,261 @@
+"""HiveMind connection used by the Home Assistant integration"""
+from collections import defaultdict
+from concurrent.futures import Future
+from threading import Event, Thread
+from typing import Callable, List, Optional, Union
+
+from hivemind_bus_client.client import HiveMessageBusClient
+from hivemind_bus_client.encryption import decrypt_bin, decrypt_from_json
+from hivemind_bus_client.message import HiveMessage, HiveMessageType
+from hivemind_bus_client.serialization import HiveMindBinaryPayloadType, decode_bitstring
+from ovos_bus_client.message import Message
+from ovos_utils.fakebus import FakeBus
+from ovos_utils.log import LOG
+
+from .capture import BusCapture, CAPTURE_INBOUND, CAPTURE_OUTBOUND
+from .codec import json_dumps, json_loads
+from .device_state import DeviceState
+from .handshake import HiveMindHAProtocol
+from .health import HealthBreakers
+from .latency import CommandLatency
+from .outbound import OutboundSender
+from .stats import BusStats
+from .tracing import BusTracer
+
+
+class HandshakeEvent(Event):
+    """threading.Event that notifies a callback when the handshake completes"""
+
+    def __init__(self, callback: Callable[[], None]):
+        super().__init__()
+        self._callback = callback
+
+    def set(self):
+        was_set = self.is_set()
+        super().set()
+        if not was_set:
+            self._callback()
+
+
+def _message_type(message: HiveMessage) -> str:
+    if message.msg_type == HiveMessageType.BUS:
+        return message["type"]
+    return message.msg_type
+
+
+class HiveMindClient(HiveMessageBusClient):
+    """HiveMessageBusClient with hooks for the integration runtime features"""
+
+    def __init__(self, *args, **kwargs):
+        # the library constructor already registers bus handlers through on_mycroft
+        self.stats = BusStats()
+        self._handlers = {}  # (msg_type, func) -> wrapped func
+        self._handled_types = defaultdict(int)  # msg_type -> registered handlers
+        super().__init__(*args, **kwargs)
+        self.capture: Optional[BusCapture] = None
+        self.tracer = BusTracer()
+        self.latency = CommandLatency()
+        self.handshake_event = HandshakeEvent(self.on_handshake)
+        self._thread: Optional[Thread] = None
+        self.bus_listeners = []  # callables receiving (msg_type, message) for every inbound bus message
+        self.handshake_listeners: List[Callable[[], None]] = []  # called on the client thread after a handshake
+        self.poller = None  # DevicePoller refreshing the entities, set by the integration
+        self.audio_handler: Optional[Callable[[bytes, dict], None]] = None  # receives RAW_AUDIO payloads
+        self._closing = False
+        self.sender = OutboundSender(self)
+        for event in ("open", "close", "error", "reconnecting"):
+            self.emitter.on(event, self._connection_event_handler(event))
+        self.device_state = DeviceState(self)
+        self.health = HealthBreakers(self.device_state)
+
+    def _connection_event_handler(self, event: str) -> Callable:
+        def handler(*args):
+            self.stats.record_connection_event(event)
+        return handler
+
+    def on_handshake(self):
+        self.stats.record_handshake()
+        self.sender.flush()
+        for listener in self.handshake_listeners:
+            listener()
+
+    @property
+    def queue_depths(self) -> dict:
+        return {"outbound": self.sender.pending,
+                "offline": len(self.sender.offline),
+                "capture": self.capture.pending if self.capture is not None else 0}
+
+    def connect(self, bus=None, protocol=None, site_id=None):
+        # the library default is a FakeBus shared by every client in the process,
+        # each connection gets its own so nothing outlives it after shutdown
+        if protocol is None:
+            self.identity.site_id = site_id or self.identity.site_id
+            protocol = HiveMindHAProtocol(self, shared_bus=self.share_bus,
+                                          site_id=self.identity.site_id or "unknown",
+                                          identity=self.identity)
+        super().connect(bus or FakeBus(), protocol, site_id)
+
+    def run_in_thread(self) -> Thread:
+        self._thread = super().run_in_thread()
+        return self._thread
+
+    def on_error(self, *args):
+        if self._closing:
+            # do not reconnect while shutting down
+            self.handshake_event.clear()
+            self.crypto_key = None
+            return
+        super().on_error(*args)
+
+    def shutdown(self, timeout: float = 5):
+        """Close the connection and release every handler and thread it owns"""
+        self._closing = True
+        self.stop_capture()
+        for msg_type, func in list(self._handlers):
+            self.remove(msg_type, func)
+        self.bus_listeners.clear()
+        self.handshake_listeners.clear()
+        self.latency.listeners.clear()
+        self.audio_handler = None
+        self.emitter.remove_all_listeners()
+        self.close()
+        self.sender.close(timeout)
+        self.handshake_event.clear()
+        self.crypto_key = None
+        self.protocol = None
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                LOG.warning("HiveMind connection thread did not stop in time")
+            self._thread = None
+
+    def start_capture(self, path: str) -> BusCapture:
+        """Start recording inbound and outbound messages to a capture file"""
+        self.stop_capture()
+        LOG.info(f"Capturing HiveMind traffic to {path}")
+        self.capture = BusCapture(path)
+        return self.capture
+
+    def stop_capture(self):
+        capture, self.capture = self.capture, None
+        if capture is not None:
+            capture.close()
+
+    def on_mycroft(self, mycroft_msg_type, func):
+        wrapped = self.stats.wrap_handler(mycroft_msg_type, func)
+        self._handlers[(mycroft_msg_type, func)] = wrapped
+        self._handled_types[mycroft_msg_type] += 1
+        super().on_mycroft(mycroft_msg_type, wrapped)
+
+    def remove(self, event_name: str, func: Callable):
+        wrapped = self._handlers.pop((event_name, func), None)
+        if wrapped is not None:
+            self._handled_types[event_name] -= 1
+            func = wrapped
+        super().remove(event_name, func)
+
+    def on_message(self, *args):
+        # same decoding as the library client with the fast codec, the raw message
+        # event is only serialized again when something listens to it
+        message = args[0] if len(args) == 1 else args[1]
+        self.stats.bytes_in += len(message)
+        if isinstance(message, str):
+            message = json_loads(message)
+        if self.crypto_key:
+            if isinstance(message, bytes):
+                message = decrypt_bin(self.crypto_key, message, cipher=self.cipher)
+            elif isinstance(message, dict) and "ciphertext" in message:
+                message = json_loads(decrypt_from_json(self.crypto_key, message,
+                                                       cipher=self.cipher, encoding=self.json_encoding))
+            else:
+                LOG.debug("Message was unencrypted")
+        if isinstance(message, bytes):
+            message = decode_bitstring(message)
+        elif isinstance(message, dict) and "ciphertext" in message:
+            LOG.error("got encrypted message, but could not decrypt!")
+            return
+
+        if not isinstance(message, HiveMessage):
+            message = HiveMessage(**message)
+        if message.msg_type == HiveMessageType.BINARY:
+            self._handle_binary(message)
+            return
+        if self.emitter.listeners("message"):
+            self.emitter.emit("message", json_dumps(message.as_dict))
+        self._handle_hive_protocol(message)
+
+    def _handle_binary(self, message: HiveMessage):
+        if self.tracer.enabled:
+            self.tracer.record(CAPTURE_INBOUND, message.msg_type, message)
+        if message.bin_type == HiveMindBinaryPayloadType.RAW_AUDIO and self.audio_handler is not None:
+            self.stats.record_in(message.msg_type)
+            try:
+                self.audio_handler(message.payload, message.metadata)
+            except Exception as e:
+                LOG.error(f"Error handling HiveMind audio: {e}")
+            return
+        super()._handle_binary(message)
+
+    def _handle_hive_protocol(self, message: HiveMessage):
+        msg_type = _message_type(message)
+        self.stats.record_in(msg_type)
+        if self.tracer.enabled:
+            self.tracer.record(CAPTURE_INBOUND, msg_type, message)
+        if self.capture is not None:
+            self.capture.record(CAPTURE_INBOUND, message)
+        if message.msg_type == HiveMessageType.BUS:
+            self.latency.received(msg_type, message["data"])
+            self.health.received(msg_type)
+            for listener in self.bus_listeners:
+                try:
+                    listener(msg_type, message)
+                except Exception as e:
+                    LOG.error(f"Error in HiveMind bus listener: {e}")
+        super()._handle_hive_protocol(message)
+
+    def _routing_context(self, context: Optional[dict]) -> dict:
+        # same routing the library client injects, on a copy instead of a JSON round trip
+        context = dict(context or {})
+        context.setdefault("source", self.useragent)
+        context.setdefault("platform", self.useragent)
+        context.setdefault("destination", "HiveMind")
+        session = dict(context.get("session") or {})
+        session["session_id"] = self.session_id
+        session["site_id"] = self.site_id
+        context["session"] = session
+        return context
+
+    def emit(self, message: Union[Message, HiveMessage],
+             binary_type: HiveMindBinaryPayloadType = HiveMindBinaryPayloadType.UNDEFINED) -> Future:
+        """Queue a message for the sender thread, the returned future resolves once it is written
+
+        message data is serialized later on the sender thread and must not be modified after emitting
+        """
+        if isinstance(message, Message):
+            message = HiveMessage(HiveMessageType.BUS, payload={
+                "type": message.msg_type,
+                "data": message.data,
+                "context": self._routing_context(message.context)
+            })
+        elif message.msg_type == HiveMessageType.BUS:
+            message["context"] = self._routing_context(message["context"])
+        msg_type = _message_type(message)
+        self.stats.record_out(msg_type, self._handled_types.get(f"{msg_type}.response", 0) > 0)
+        if message.msg_type == HiveMessageType.BUS:
+            self.latency.sent(msg_type)
+            self.health.sent(msg_type)
+        if self.tracer.enabled:
+            self.tracer.record(CAPTURE_OUTBOUND, msg_type, message)
+        if message.msg_type in (HiveMessageType.HELLO, HiveMessageType.HANDSHAKE):
+            # connection setup, sent inline by the protocol from the client thread
+            super().emit(message, binary_type)
+            future = Future()
+            future.set_result(None)
+        else:
+            future = self.sender.submit(message, msg_type, binary_type)
+        if self.capture is not None:
+            self.capture.record(CAPTURE_OUTBOUND, message)
+        return future
+
+    def emit_mycroft(self, message: Message) -> Future:
+        return self.emit(message)
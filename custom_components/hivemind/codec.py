@@ -0,0 +1,27 @@
+"""JSON codec for HiveMind messages, uses orjson when it is installed"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    # Session and Message objects nested in a message context or data
+    if hasattr(obj, "serialize"):
+        return obj.serialize()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps(obj: Any) -> str:
+    if orjson is None:
+        return json.dumps(obj, ensure_ascii=False, default=_default)
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
@@ -2,8 +2,11 @@ from typing import Any
 
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.core import callback
 
-from .const import DOMAIN
+from .const import (DOMAIN, CONF_FORWARD_EVENTS, CONF_FORWARD_RATE_LIMIT,
+                    DEFAULT_FORWARD_EVENTS, DEFAULT_FORWARD_RATE_LIMIT, CONF_STREAM_MEDIA,
+                    CONF_STALL_THRESHOLD)
 
 # Specify items in the order they are to be displayed in the UI
 HIVEMIND_SCHEMA = {
@@ -30,3 +33,34 @@ class HiveMindConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             return self.async_create_entry(title="HiveMind", data=user_input)
 
         return self.async_show_form(step_id="user", data_schema=vol.Schema(HIVEMIND_SCHEMA))
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry):
+        return HiveMindOptionsFlow(config_entry)
+
+
+class HiveMindOptionsFlow(config_entries.OptionsFlow):
+    """HiveMind runtime options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry):
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None):
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        schema = {
+            vol.Optional(CONF_FORWARD_EVENTS,
+                         default=options.get(CONF_FORWARD_EVENTS, DEFAULT_FORWARD_EVENTS)): str,
+            vol.Optional(CONF_FORWARD_RATE_LIMIT,
+                         default=options.get(CONF_FORWARD_RATE_LIMIT, DEFAULT_FORWARD_RATE_LIMIT)):
+                vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(CONF_STREAM_MEDIA,
+                         default=options.get(CONF_STREAM_MEDIA, False)): bool,
+            vol.Optional(CONF_STALL_THRESHOLD,
+                         default=options.get(CONF_STALL_THRESHOLD, 0)):
+                vol.All(vol.Coerce(int), vol.Range(min=0))
+        }
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(schema))
@@ -1,2 +1,17 @@
 DOMAIN = "hivemind"
 
+PLATFORMS = ["notify", "binary_sensor", "sensor", "button", "media_player", "switch", "select",
+             "conversation"]
+
+DATA_REQUEST_LIMITER = f"{DOMAIN}_request_limiter"  # RequestLimiter shared by all entries
+
+ECHO_CONTEXT = "hivemind_echo"  # context flag of outbound bus messages replayed to the local handlers
+
+CONF_FORWARD_EVENTS = "forward_events"
+CONF_FORWARD_RATE_LIMIT = "forward_rate_limit"
+
+DEFAULT_FORWARD_EVENTS = "recognizer_loop:utterance, speak, mycroft.skill.handler.*, complete_intent_failure"
+DEFAULT_FORWARD_RATE_LIMIT = 5.0
+
+CONF_STREAM_MEDIA = "stream_media"
+CONF_STALL_THRESHOLD = "stall_threshold"  # milliseconds, 0 disables stall detection
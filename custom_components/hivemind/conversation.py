@@ -0,0 +1,116 @@
+"""HiveMind conversation agent."""
+import asyncio
+import logging
+from typing import Literal
+from uuid import uuid4
+
+from hivemind_bus_client.client import HiveMessageBusClient
+from homeassistant.components.conversation import ConversationEntity, ConversationInput, ConversationResult
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import MATCH_ALL
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import intent
+from ovos_bus_client.message import Message
+
+from .entity import HiveMindEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+# OVOS forwards the context of the utterance to the speak messages it generates
+CONTEXT_REQUEST_ID = "hivemind_ha_request"
+REPLY_TIMEOUT = 15  # seconds, utterances are held offline for less (offline.COMMAND_POLICIES)
+
+
+class HiveMindConversationAgent(HiveMindEntity, ConversationEntity):
+    """Send text to OVOS and answer with the first reply it speaks"""
+
+    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
+        """Initialize the service."""
+        super().__init__(bus, site_id, name, **kwargs)
+        self._pending: dict[str, asyncio.Future] = {}
+        self.bus.on_mycroft("speak", self.handle_speak)
+
+    @property
+    def available(self) -> bool:
+        return self.bus.handshake_event.is_set()
+
+    @property
+    def name(self):
+        """Name of the entity."""
+        return f"Conversation ({self._name})"
+
+    @property
+    def unique_id(self) -> str | None:
+        """Return a unique ID for this entity."""
+        return f"hm-conversation-{self._name}-{self.site_id}".replace(" ", "")
+
+    @property
+    def supported_languages(self) -> list[str] | Literal["*"]:
+        return MATCH_ALL
+
+    @property
+    def icon(self) -> str | None:
+        return "mdi:robot-outline"
+
+    def handle_speak(self, message: Message):
+        future = self._pending.get(message.context.get(CONTEXT_REQUEST_ID))
+        if future is not None:
+            self.hass.loop.call_soon_threadsafe(_set_reply, future, message.data.get("utterance", ""))
+
+    async def async_process(self, user_input: ConversationInput) -> ConversationResult:
+        """Process a sentence."""
+        if not self.bus.handshake_event.is_set():
+            # held utterances would reach the device after this answer, and their reply is discarded
+            return _error_result(user_input, "The HiveMind device is not connected")
+        request_id = uuid4().hex
+        future = self.hass.loop.create_future()
+        self._pending[request_id] = future
+        message = Message("recognizer_loop:utterance",
+                          {"utterances": [user_input.text], "lang": user_input.language},
+                          {CONTEXT_REQUEST_ID: request_id})
+        try:
+            self.bus.emit_mycroft(message)
+            reply = await asyncio.wait_for(future, REPLY_TIMEOUT)
+        except asyncio.TimeoutError:
+            reply = None
+        finally:
+            self._pending.pop(request_id, None)
+
+        if reply is None:
+            _LOGGER.warning(f"No reply from OVOS within {REPLY_TIMEOUT} seconds")
+            return _error_result(user_input, "No answer from the HiveMind device")
+        response = intent.IntentResponse(language=user_input.language)
+        response.async_set_speech(reply)
+        return ConversationResult(response=response, conversation_id=user_input.conversation_id)
+
+
+def _error_result(user_input: ConversationInput, error: str) -> ConversationResult:
+    response = intent.IntentResponse(language=user_input.language)
+    response.async_set_error(intent.IntentResponseErrorCode.UNKNOWN, error)
+    return ConversationResult(response=response, conversation_id=user_input.conversation_id)
+
+
+def _set_reply(future: asyncio.Future, utterance: str):
+    # later replies to the same utterance are ignored, the first one answers
+    if not future.done():
+        future.set_result(utterance)
+
+
+async def async_setup_entry(
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        async_add_entities
+):
+    """Set up conversation agent from a config entry."""
+    # Get config values
+    name = entry.data.get("name", "unnamed device")
+    site_id = entry.data.get("site_id", "unknown")
+
+    agent = HiveMindConversationAgent(
+        bus=entry.hm_bus,
+        name=name,
+        site_id=site_id
+    )
+
+    # Add it to Home Assistant
+    async_add_entities([agent])
@@ -0,0 +1,168 @@
+"""Last known state of a HiveMind device, shared by all its entities"""
+from collections import defaultdict
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Set
+
+from ovos_bus_client.message import Message
+
+from .const import ECHO_CONTEXT
+
+HEALTH_SERVICES = ("skills", "audio", "voice", "PHAL", "gui_service")
+
+# field -> value before the device reported anything
+DEFAULTS: Dict[str, Any] = {
+    "volume": 0.5,
+    "muted": False,
+    "mic_muted": False,
+    "listener_state": "wakeword",
+    "listening_mode": "wakeword",
+    "sleeping": False,
+    "speaking": False,
+    "ssh": False,
+    "player_state": None,  # ovos_utils.ocp PlayerState
+    "media_state": None,  # ovos_utils.ocp MediaState
+    "shuffle": False,
+    "loop_state": None,  # ovos_utils.ocp LoopState
+    **{f"alive:{service}": False for service in HEALTH_SERVICES},
+    **{f"ready:{service}": False for service in HEALTH_SERVICES},
+    **{f"missing:{service}": False for service in HEALTH_SERVICES},  # set by HealthBreakers
+}
+
+
+class DeviceState:
+    """Device state parsed once from the bus, entities are only told about the fields that changed
+
+    every message updating the model is handled here instead of by each entity, an update
+    that repeats the known values notifies nobody so polling responses cause no state writes.
+    Values restored from before a restart are provisional until the device reports them,
+    commands sent by Home Assistant and echoed to the local handlers report nothing
+    """
+
+    def __init__(self, bus):
+        self._values = dict(DEFAULTS)
+        self._subscribers: Dict[str, List[Callable[[Set[str]], None]]] = defaultdict(list)
+        self._reported: Set[str] = set()  # fields the device reported since startup
+        self._provisional: Set[str] = set()  # restored fields not confirmed yet
+        self._lock = Lock()
+        self.updates = 0
+        self.changes = 0
+        handlers = {
+            "mycroft.volume.get.response": self.handle_volume,
+            "mycroft.volume.mute": lambda message: self.update(muted=True),
+            "mycroft.volume.unmute": lambda message: self.update(muted=False),
+            "mycroft.mic.get_status.response":
+                lambda message: self.update(mic_muted=message.data.get("muted", False)),
+            "recognizer_loop:state": self.handle_listener_state,
+            "recognizer_loop:sleep": lambda message: self.update(sleeping=True, listener_state="sleeping"),
+            "recognizer_loop:awoken": lambda message: self.update(sleeping=False, listener_state="wake_up"),
+            "mycroft.audio.is_speaking":
+                lambda message: self.update(speaking=message.data.get("speaking", False)),
+            "system.ssh.status.response": lambda message: self.update(ssh=message.data.get("enabled", False)),
+            "system.ssh.enabled": lambda message: self.update(ssh=True),
+            "system.ssh.disabled": lambda message: self.update(ssh=False),
+            "ovos.common_play.player.state": lambda message: self.update(player_state=message.data["state"]),
+            "ovos.common_play.media.state": lambda message: self.update(media_state=message.data["state"]),
+            "ovos.common_play.player.status.response": self.handle_player_status,
+        }
+        for service in HEALTH_SERVICES:
+            handlers[f"mycroft.{service}.is_alive.response"] = self._health_handler(f"alive:{service}")
+            handlers[f"mycroft.{service}.is_ready.response"] = self._health_handler(f"ready:{service}")
+        for msg_type, handler in handlers.items():
+            bus.on_mycroft(msg_type, self._device_handler(handler))
+
+    def __getitem__(self, field: str):
+        return self._values[field]
+
+    def subscribe(self, fields: Iterable[str], callback: Callable[[Set[str]], None]) -> Callable[[], None]:
+        """Call ``callback`` with the changed fields whenever one of ``fields`` changes, returns an unsubscribe"""
+        fields = tuple(fields)
+        with self._lock:
+            for field in fields:
+                self._subscribers[field].append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                for field in fields:
+                    if callback in self._subscribers[field]:
+                        self._subscribers[field].remove(callback)
+        return unsubscribe
+
+    def is_provisional(self, fields: Iterable[str]) -> bool:
+        return not self._provisional.isdisjoint(fields)
+
+    def restore(self, **fields) -> Set[str]:
+        """Seed fields the device did not report yet with their value from before a restart"""
+        with self._lock:
+            fields = {field: value for field, value in fields.items() if field not in self._reported}
+            self._provisional.update(fields)
+        return self._store(fields)
+
+    def update(self, **fields) -> Set[str]:
+        """Store values reported by the device, subscribers of the fields that changed are notified once each"""
+        with self._lock:
+            self.updates += 1
+            self._reported.update(fields)
+            # a confirmed provisional value changes the entity attributes even if the value is the same
+            confirmed = self._provisional.intersection(fields)
+            self._provisional.difference_update(fields)
+        return self._store(fields, confirmed)
+
+    def set_optimistic(self, **fields) -> Set[str]:
+        """Store the values a command is expected to cause, they stay unreported until the device confirms"""
+        return self._store(fields)
+
+    def _store(self, fields: dict, changed: Set[str] = frozenset()) -> Set[str]:
+        with self._lock:
+            changed = set(changed) | {field for field, value in fields.items()
+                                      if self._values.get(field) != value}
+            if not changed:
+                return changed
+            self.changes += 1
+            self._values.update({field: fields[field] for field in changed})
+            callbacks = []
+            for field in changed:
+                for callback in self._subscribers.get(field, ()):
+                    if callback not in callbacks:
+                        callbacks.append(callback)
+        for callback in callbacks:
+            callback(changed)
+        return changed
+
+    def handle_volume(self, message: Message):
+        fields = {"muted": message.data.get("muted", False)}
+        if "percent" in message.data:
+            fields["volume"] = message.data["percent"]
+        self.update(**fields)
+
+    def handle_listener_state(self, message: Message):
+        state = message.data.get("state", "wakeword")
+        fields = {"listener_state": state, "sleeping": state == "sleeping"}
+        mode = message.data.get("mode", "wakeword")
+        if mode != "sleeping":
+            fields["listening_mode"] = mode
+        self.update(**fields)
+
+    def handle_player_status(self, message: Message):
+        self.update(player_state=message.data["state"],
+                    media_state=message.data["media_state"],
+                    loop_state=message.data["repeat"],
+                    shuffle=message.data["shuffle"])
+
+    @staticmethod
+    def _device_handler(handler: Callable[[Message], None]) -> Callable[[Message], None]:
+        def wrapped(message: Message):
+            if not message.context.get(ECHO_CONTEXT):
+                handler(message)
+        return wrapped
+
+    def _health_handler(self, field: str) -> Callable[[Message], None]:
+        def handler(message: Message):
+            self.update(**{field: message.data.get("status", False)})
+        return handler
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {"values": dict(self._values),
+                    "provisional": sorted(self._provisional),
+                    "updates": self.updates,
+                    "changes": self.changes}
@@ -0,0 +1,37 @@
+"""Diagnostics support for HiveMind"""
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+TO_REDACT = {"access_key", "password"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    bus = entry.hm_bus
+    return {
+        "config": async_redact_data(dict(entry.data), TO_REDACT),
+        "options": async_redact_data(dict(entry.options), TO_REDACT),
+        "connection": {
+            "connected": bus.connected_event.is_set(),
+            "handshake": bus.handshake_event.is_set(),
+            "cipher": bus.cipher,
+            "encoding": bus.json_encoding,
+            "binarize": bool(bus.protocol and bus.protocol.binarize),
+            "site_id": bus.site_id,
+            "session_id": bus.session_id
+        },
+        "queues": {**bus.queue_depths, "assist_streams": entry.hm_assist.active_streams},
+        "outbound": bus.sender.as_dict(),
+        "event_bridge": entry.hm_event_bridge.as_dict(),
+        "capture": bus.capture.as_dict() if bus.capture is not None else None,
+        "tracing": bus.tracer.as_dict(),
+        "command_latency": bus.latency.as_dict(),
+        "device_state": bus.device_state.as_dict(),
+        "polling": bus.poller.as_dict(),
+        "health": bus.health.as_dict(),
+        "stalls": bus.stats.stalls.as_dict() if bus.stats.stalls is not None else None,
+        "stats": bus.stats.as_dict()
+    }
@@ -0,0 +1,102 @@
+"""Base entity for HiveMind devices"""
+from typing import List, Optional, Set, Tuple
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import State, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.restore_state import RestoreEntity
+from ovos_bus_client.message import Message
+
+from .client import HiveMindClient
+from .const import DOMAIN
+from .polling import activity_interval
+
+
+class HiveMindEntity(RestoreEntity):
+    """Entity bound to the HiveMind connection of a config entry"""
+
+    # DeviceState fields the entity state is made of, it is written when one of them changes
+    state_fields: Tuple[str, ...] = ()
+
+    def __init__(self, bus: HiveMindClient, site_id: str, name: str, **kwargs) -> None:
+        """Initialize the service."""
+        self._name = name.replace(" ", "-")
+        self.site_id = site_id
+        self.bus = bus
+        if bus.stats.stalls is not None:
+            bus.stats.stalls.instrument(self)
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info."""
+        return DeviceInfo(
+            identifiers={
+                # Serial numbers are unique identifiers within a specific domain
+                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
+            },
+            name=self._name,
+            manufacturer="JarbasAI",
+            model="HiveMindBus"
+        )
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self.state_fields:
+            # shown until the device answers the snapshot, instead of the DeviceState defaults
+            last_state = await self.async_get_last_state()
+            if last_state is not None and last_state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+                self.bus.device_state.restore(**self.restored_fields(last_state))
+            self.async_on_remove(self.bus.device_state.subscribe(self.state_fields,
+                                                                 self.handle_state_change))
+        if self.bus.poller is not None:
+            self.async_on_remove(self.bus.poller.add(self))
+
+    def restored_fields(self, state: State) -> dict:
+        """DeviceState fields parsed from the state the entity had before a restart"""
+        return {}
+
+    def poll_messages(self) -> List[Message]:
+        """Queries refreshing the entity, sent by its updates and by the device snapshots"""
+        return []
+
+    @property
+    def poll_interval(self) -> float:
+        """Seconds between the polls of poll_messages by the DevicePoller"""
+        return activity_interval(self.bus.device_state)
+
+    @property
+    def should_poll(self) -> bool:
+        # entities sending queries are polled by the DevicePoller, on staggered schedules
+        return self.bus.poller is None or not self.poll_messages()
+
+    @property
+    def extra_state_attributes(self) -> Optional[dict]:
+        if self.state_fields and self.bus.device_state.is_provisional(self.state_fields):
+            return {"provisional": True}
+        return None
+
+    def handle_state_change(self, changed: Set[str]):
+        """Called from the bus thread when a field in state_fields changed"""
+        self.schedule_update_ha_state()
+
+    async def async_device_update(self, warning: bool = True) -> None:
+        # polling a disconnected device only queues queries that will never be answered
+        if not self.bus.handshake_event.is_set():
+            return
+        # the snapshot after a handshake replaces the next poll
+        if self.bus.poller is not None and self.bus.poller.snapshot_pending:
+            return
+        await super().async_device_update(warning)
+
+    async def async_update(self):
+        for message in self.poll_messages():
+            self.bus.emit_mycroft(message)
+
+    def schedule_update_ha_state(self, force_refresh: bool = False) -> None:
+        self.bus.stats.record_write(self.entity_id)
+        super().schedule_update_ha_state(force_refresh)
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        self.bus.stats.record_write(self.entity_id)
+        super().async_write_ha_state()
@@ -0,0 +1,130 @@
+"""Forward selected OVOS bus messages to the Home Assistant event bus"""
+import fnmatch
+import re
+import time
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from hivemind_bus_client.message import HiveMessage
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+EVENT_HIVEMIND_MESSAGE = f"{DOMAIN}_message"
+
+_GLOB_CHARS = set("*?[")
+_END = object()  # marks the end of a prefix in the trie
+
+
+def parse_patterns(patterns: str) -> list:
+    """Split a comma or whitespace separated list of message type patterns"""
+    return [p for p in re.split(r"[,\s]+", patterns or "") if p]
+
+
+class MessageTypeFilter:
+    """Precompiled index of message type patterns
+
+    exact names are a set lookup, ``prefix*`` patterns a walk down a character trie
+    and any other glob is folded into one compiled regex,
+    so a message type is never checked against each rule in turn
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._match_all = False
+        self._exact = set()
+        self._prefixes = {}
+        globs = []
+        for pattern in patterns:
+            if pattern == "*":
+                self._match_all = True
+            elif not _GLOB_CHARS.intersection(pattern):
+                self._exact.add(pattern)
+            elif pattern.endswith("*") and not _GLOB_CHARS.intersection(pattern[:-1]):
+                node = self._prefixes
+                for c in pattern[:-1]:
+                    node = node.setdefault(c, {})
+                node[_END] = True
+            else:
+                globs.append(fnmatch.translate(pattern))
+        self._glob = re.compile("|".join(globs)) if globs else None
+
+    def __bool__(self) -> bool:
+        return bool(self._match_all or self._exact or self._prefixes or self._glob)
+
+    def match(self, msg_type: str) -> bool:
+        if self._match_all or msg_type in self._exact:
+            return True
+        node = self._prefixes
+        if node:
+            for c in msg_type:
+                if _END in node:
+                    return True
+                node = node.get(c)
+                if node is None:
+                    break
+            else:
+                if _END in node:
+                    return True
+        return self._glob is not None and self._glob.match(msg_type) is not None
+
+
+class RateLimiter:
+    """Token bucket per key, ``rate`` events per second with bursts of up to ``burst``
+
+    a rate of 0 disables limiting
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self.dropped = defaultdict(int)
+        self._buckets = {}  # key -> [tokens, last update]
+
+    def allow(self, key: str) -> bool:
+        if not self.rate:
+            return True
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [self.burst - 1, now]
+            return True
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            self.dropped[key] += 1
+            return False
+        bucket[0] = tokens - 1
+        return True
+
+
+class BusEventBridge:
+    """Fire ``hivemind_message`` events for the bus messages matching a filter
+
+    called from the HiveMind client thread for every inbound bus message
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, site_id: str,
+                 patterns: Iterable[str], rate: float = 0):
+        self.hass = hass
+        self.entry_id = entry_id
+        self.site_id = site_id
+        self.filter = MessageTypeFilter(patterns)
+        self.limiter = RateLimiter(rate)
+        self.forwarded = defaultdict(int)
+
+    def __call__(self, msg_type: str, message: HiveMessage):
+        if not self.filter.match(msg_type) or not self.limiter.allow(msg_type):
+            return
+        self.forwarded[msg_type] += 1
+        self.hass.bus.fire(EVENT_HIVEMIND_MESSAGE, {
+            "entry_id": self.entry_id,
+            "site_id": self.site_id,
+            "type": msg_type,
+            "data": message["data"] or {},
+            "context": message["context"] or {}
+        })
+
+    def as_dict(self) -> dict:
+        return {"forwarded": dict(self.forwarded),
+                "dropped": dict(self.limiter.dropped)}
@@ -0,0 +1,80 @@
+"""Handshake material reused across connections and reconnects"""
+import os
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from hivemind_bus_client.identity import NodeIdentity
+from hivemind_bus_client.message import HiveMessageType
+from hivemind_bus_client.protocol import HiveMindSlaveInternalProtocol, HiveMindSlaveProtocol
+from ovos_utils.fakebus import FakeBus
+from ovos_utils.log import LOG
+from poorman_handshake import HandShake, PasswordHandShake
+from poorman_handshake.asymmetric.utils import load_RSA_key
+
+_RSA_KEYS: Dict[Tuple[str, float], object] = {}  # (pem path, mtime) -> parsed private key
+_RSA_LOCK = Lock()
+
+
+class CachedKeyHandShake(HandShake):
+    """RSA handshake that parses each private key file once per process"""
+
+    def load_private(self, path: str):
+        key = (path, os.path.getmtime(path))
+        with _RSA_LOCK:
+            if key not in _RSA_KEYS:
+                _RSA_KEYS[key] = load_RSA_key(path)
+            self.private_key = _RSA_KEYS[key]
+
+
+class CachedPasswordHandShake(PasswordHandShake):
+    """Password handshake that derives the session key once per salt
+
+    the library reads ``secret`` more than once per handshake and every read
+    runs 100k PBKDF2 iterations
+    """
+
+    def __init__(self, password: str):
+        super().__init__(password)
+        self._derived: Optional[Tuple[bytes, bytes]] = None  # (salt, secret)
+
+    @property
+    def secret(self) -> bytes:
+        derived = self._derived
+        if derived is None or derived[0] != self.salt:
+            derived = self._derived = (self.salt, PasswordHandShake.secret.fget(self))
+        return derived[1]
+
+
+class HiveMindHAProtocol(HiveMindSlaveProtocol):
+    """HiveMindSlaveProtocol using the cached handshakes
+
+    ``bind`` is a copy of HiveMindSlaveProtocol.bind from hivemind_bus_client 0.4.4, keep it
+    in sync with the library version pinned in manifest.json
+    """
+
+    def bind(self, bus=None):
+        # same as the library, except for the handshake classes
+        if self.identity is None:
+            self.identity = self.hm.identity or NodeIdentity()
+        self.handshake = CachedKeyHandShake(self.identity.private_key)
+        self.pswd_handshake = CachedPasswordHandShake(self.identity.password) if self.identity.password else None
+
+        LOG.info("Initializing HiveMindSlaveInternalProtocol")
+        self.internal_protocol = HiveMindSlaveInternalProtocol(bus=bus or FakeBus(), hm_bus=self.hm)
+        self.internal_protocol.register_bus_handlers()
+        LOG.info("registering protocol handlers")
+        self.hm.on(HiveMessageType.HELLO, self.handle_hello)
+        self.hm.on(HiveMessageType.BROADCAST, self.handle_broadcast)
+        self.hm.on(HiveMessageType.PROPAGATE, self.handle_propagate)
+        self.hm.on(HiveMessageType.INTERCOM, self.handle_intercom)
+        self.hm.on(HiveMessageType.ESCALATE, self.handle_illegal_msg)
+        self.hm.on(HiveMessageType.SHARED_BUS, self.handle_illegal_msg)
+        self.hm.on(HiveMessageType.BUS, self.handle_bus)
+        self.hm.on(HiveMessageType.HANDSHAKE, self.handle_handshake)
+
+    def start_handshake(self):
+        # handle_handshake replaces pswd_handshake with a plain PasswordHandShake when the
+        # hub asks for a password handshake, right before starting it
+        if self.pswd_handshake is not None and not isinstance(self.pswd_handshake, CachedPasswordHandShake):
+            self.pswd_handshake = CachedPasswordHandShake(self.identity.password)
+        super().start_handshake()
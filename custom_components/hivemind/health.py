@@ -0,0 +1,102 @@
+"""Circuit breakers for the is_alive and is_ready probes of the OVOS services of a device"""
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, Optional
+
+from ovos_utils.log import LOG
+
+from .device_state import HEALTH_SERVICES
+
+PROBE_FAILURES = 3  # unanswered probes before a service is considered not installed
+PROBE_BACKOFF = 60  # seconds between probes of a missing service, doubled after every unanswered one
+MAX_PROBE_BACKOFF = 3600
+
+# service -> prefixes of the message types only it sends, any of them proves it is running
+SERVICE_MESSAGES = {
+    "skills": ("mycroft.skills.", "mycroft.skill.", "mycroft.intent."),
+    "audio": ("mycroft.audio.", "ovos.common_play."),
+    "voice": ("mycroft.voice.", "mycroft.mic.", "recognizer_loop:"),
+    "PHAL": ("mycroft.PHAL.", "mycroft.volume.", "system."),
+    "gui_service": ("mycroft.gui_service.", "mycroft.gui.", "gui."),
+}
+
+
+class ServiceBreaker:
+    """Probes of one service sent since it was last heard from"""
+
+    def __init__(self):
+        self.probes: Dict[str, int] = defaultdict(int)  # probe type -> probes sent
+
+    @property
+    def failures(self) -> int:
+        # the last probe of each type may still be answered
+        return max(max(self.probes.values(), default=0) - 1, 0)
+
+    @property
+    def open(self) -> bool:
+        return self.failures >= PROBE_FAILURES
+
+    @property
+    def interval(self) -> float:
+        return min(PROBE_BACKOFF * 2 ** (self.failures - PROBE_FAILURES), MAX_PROBE_BACKOFF)
+
+
+class HealthBreakers:
+    """Stop probing services that never answer, like ovos-gui on a headless device
+
+    after ``PROBE_FAILURES`` unanswered probes the ``missing:<service>`` field of the
+    DeviceState is set and the service is probed with exponentially growing intervals.
+    Any message the service sends closes its breaker again
+    """
+
+    def __init__(self, device_state):
+        self.device_state = device_state
+        self.breakers = {service: ServiceBreaker() for service in HEALTH_SERVICES}
+        self._probes = {}  # probe type -> service
+        for service in HEALTH_SERVICES:
+            self._probes[f"mycroft.{service}.is_alive"] = service
+            self._probes[f"mycroft.{service}.is_ready"] = service
+        self._services: Dict[str, Optional[str]] = {}  # inbound message type -> service sending it
+        self._lock = Lock()
+
+    def interval(self, service: str) -> float:
+        return self.breakers[service].interval
+
+    def sent(self, msg_type: str):
+        service = self._probes.get(msg_type)
+        if service is None:
+            return
+        breaker = self.breakers[service]
+        with self._lock:
+            was_open = breaker.open
+            breaker.probes[msg_type] += 1
+            opened = breaker.open and not was_open
+        if opened:
+            LOG.info(f"HiveMind service {service} did not answer {PROBE_FAILURES} probes, "
+                     f"backing off from {PROBE_BACKOFF}s")
+            self.device_state.update(**{f"missing:{service}": True})
+
+    def received(self, msg_type: str):
+        service = self._services.get(msg_type, "")
+        if service == "":
+            service = self._services[msg_type] = next(
+                (service for service, prefixes in SERVICE_MESSAGES.items() if msg_type.startswith(prefixes)),
+                None)
+        if service is None:
+            return
+        breaker = self.breakers[service]
+        if not breaker.probes:
+            return
+        with self._lock:
+            was_open = breaker.open
+            breaker.probes.clear()
+        if was_open:
+            LOG.info(f"HiveMind service {service} is back")
+            self.device_state.update(**{f"missing:{service}": False})
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {service: {"failures": breaker.failures,
+                              "open": breaker.open,
+                              "interval": breaker.interval if breaker.open else None}
+                    for service, breaker in self.breakers.items()}
@@ -0,0 +1,114 @@
+"""Time between a command sent to a HiveMind device and the event confirming it took effect"""
+import time
+from collections import defaultdict
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ovos_utils.ocp import PlayerState
+
+from .stats import Histogram
+
+CONFIRM_TIMEOUT = 10  # seconds without a confirmation before a command counts as failed
+EXPIRE_INTERVAL = 5  # seconds between the expiry checks scheduled by the integration
+
+# command type -> (confirming message type, data the confirmation must contain)
+CONFIRMATIONS: Dict[str, Tuple[str, dict]] = {
+    "ovos.common_play.play": ("ovos.common_play.player.state", {"state": PlayerState.PLAYING}),
+    "ovos.common_play.resume": ("ovos.common_play.player.state", {"state": PlayerState.PLAYING}),
+    "ovos.common_play.pause": ("ovos.common_play.player.state", {"state": PlayerState.PAUSED}),
+    "ovos.common_play.stop": ("ovos.common_play.player.state", {"state": PlayerState.STOPPED}),
+    "mycroft.volume.mute": ("mycroft.volume.mute", {}),
+    "mycroft.volume.unmute": ("mycroft.volume.unmute", {}),
+    "system.ssh.enable": ("system.ssh.enabled", {}),
+    "system.ssh.disable": ("system.ssh.disabled", {}),
+    "recognizer_loop:sleep": ("recognizer_loop:sleep", {}),
+    "recognizer_loop:wake_up": ("recognizer_loop:awoken", {}),
+}
+
+
+class CommandLatency:
+    """Match outbound commands with their confirming inbound events
+
+    only the last command of a type is waited on, a newer one replaces it.
+    Commands are expired when the next confirmation, command or ``expire`` call comes
+    after their deadline, the integration calls ``expire`` every ``EXPIRE_INTERVAL`` seconds
+    """
+
+    def __init__(self, timeout: float = CONFIRM_TIMEOUT):
+        self.timeout = timeout
+        self.latency: Dict[str, Histogram] = {}
+        self.last: Dict[str, float] = {}
+        self.failures = defaultdict(int)
+        self.listeners: List[Callable[[], None]] = []  # called on the bus thread after every change
+        self._pending: Dict[str, float] = {}  # command type -> monotonic time sent
+        self._waiting: Dict[str, List[str]] = defaultdict(list)  # confirming type -> command types
+        for command, (confirmation, _) in CONFIRMATIONS.items():
+            self._waiting[confirmation].append(command)
+        self._lock = Lock()
+
+    def sent(self, msg_type: str):
+        if msg_type not in CONFIRMATIONS:
+            return
+        with self._lock:
+            changed = self._expire(time.monotonic())
+            self._pending[msg_type] = time.monotonic()
+        if changed:
+            self._notify()
+
+    def received(self, msg_type: str, data: Optional[dict]):
+        commands = self._waiting.get(msg_type)
+        if not commands or not self._pending:
+            return
+        now = time.monotonic()
+        data = data or {}
+        with self._lock:
+            changed = self._expire(now)
+            for command in commands:
+                sent = self._pending.get(command)
+                expected = CONFIRMATIONS[command][1]
+                if sent is None or any(data.get(k) != v for k, v in expected.items()):
+                    continue
+                del self._pending[command]
+                latency = now - sent
+                histogram = self.latency.get(command)
+                if histogram is None:
+                    histogram = self.latency[command] = Histogram()
+                histogram.observe(latency)
+                self.last[command] = latency
+                changed = True
+        if changed:
+            self._notify()
+
+    def expire(self):
+        """Count the commands past their deadline as failed"""
+        with self._lock:
+            changed = self._expire(time.monotonic())
+        if changed:
+            self._notify()
+
+    def _expire(self, now: float) -> bool:
+        expired = [command for command, sent in self._pending.items() if now - sent > self.timeout]
+        for command in expired:
+            del self._pending[command]
+            self.failures[command] += 1
+        return bool(expired)
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener()
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {command: self._command_dict(command)
+                    for command in sorted(set(self.latency) | set(self.failures))}
+
+    def _command_dict(self, command: str) -> dict:
+        histogram = self.latency.get(command)
+        if histogram is None:
+            return {"confirmed": 0, "failures": self.failures[command],
+                    "last": None, "mean": None, "max": None}
+        return {"confirmed": histogram.count,
+                "failures": self.failures.get(command, 0),
+                "last": round(self.last[command], 4),
+                "mean": round(histogram.sum / histogram.count, 4),
+                "max": round(histogram.max, 4)}
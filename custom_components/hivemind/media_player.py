@@ -1,8 +1,7 @@
 
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Set
 from hivemind_bus_client.client import HiveMessageBusClient
-from hivemind_bus_client.message import HiveMessageType, HiveMessage
 from ovos_utils.log import LOG
 from homeassistant.components.media_player import (
     MediaPlayerEntity,
@@ -11,12 +10,11 @@ from homeassistant.components.media_player import (
     MediaPlayerEnqueue
 )
 from homeassistant.components.media_player.const import (
-    MediaType, MediaPlayerEntityFeature, RepeatMode, MediaPlayerState, MediaClass
+    MediaType, MediaPlayerEntityFeature, RepeatMode, MediaPlayerState, MediaClass,
+    ATTR_MEDIA_VOLUME_LEVEL, ATTR_MEDIA_VOLUME_MUTED, ATTR_MEDIA_SHUFFLE, ATTR_MEDIA_REPEAT
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import STATE_IDLE, STATE_PLAYING, STATE_PAUSED
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.core import HomeAssistant, State
 from ovos_bus_client.message import Message
 from homeassistant.components import media_source
 from homeassistant.components.media_player.browse_media import (
@@ -27,7 +25,10 @@ from ovos_utils.ocp import (MediaType as OCPMediaType, MediaEntry, TrackState,
                             PlaybackType, PlaybackMode, PlayerState, MediaState, LoopState)
 
 
-from .const import DOMAIN
+from .const import CONF_STREAM_MEDIA
+from .entity import HiveMindEntity
+from .media_stream import local_media_path, stream_file
+from .tracks import TrackCache, TrackMetadata
 
 mapping = {
     MediaType.MUSIC.value: OCPMediaType.MUSIC,
@@ -40,6 +41,17 @@ mapping = {
 
 }
 
+# Home Assistant state before a restart -> DeviceState value restored from it
+RESTORED_PLAYER_STATES = {
+    MediaPlayerState.PLAYING.value: PlayerState.PLAYING,
+    MediaPlayerState.PAUSED.value: PlayerState.PAUSED,
+    MediaPlayerState.IDLE.value: PlayerState.STOPPED,
+}
+RESTORED_LOOP_STATES = {
+    RepeatMode.ALL.value: LoopState.REPEAT,
+    RepeatMode.ONE.value: LoopState.REPEAT_TRACK,
+    RepeatMode.OFF.value: LoopState.NONE,
+}
 
 _LOGGER = logging.getLogger(__name__)
 SUPPORT_HIVEMIND = (
@@ -67,106 +79,86 @@ SUPPORT_HIVEMIND = (
 )
 
 
-class HiveMindMediaPlayer(MediaPlayerEntity):
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, legacy_audio:bool=False,**kwargs) -> None:
+class HiveMindMediaPlayer(HiveMindEntity, MediaPlayerEntity):
+    state_fields = ("volume", "muted", "player_state", "media_state", "shuffle", "loop_state")
+
+    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, legacy_audio:bool=False,
+                 stream_media: bool = False, **kwargs) -> None:
         """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
+        super().__init__(bus, site_id, name, **kwargs)
         self.legacy_audioservice = legacy_audio
+        self.stream_media = stream_media
 
         self._state = MediaPlayerState.ON
-        self._volume_level = 0.5
-        self._is_muted = False
-        self._is_shuffle = False
-        self._repeat = RepeatMode.OFF
 
-        self._track_len = 0
         self._playback_pos = 0
-        self._track_title = ""
-        self._track_artist = ""
-        self._track_album = ""
-        self._image = ""
+        self._track = TrackMetadata()
+        self._tracks = TrackCache()
         self._uri = ""
 
         self._media_content_type = MediaType.MUSIC
+        self._update_state({"player_state", "media_state"})
 
         self.register_events()
 
-    def handle_ocp_track_state(self, message: Message):
-        LOG.info(f"track data: {message.data}")
-
-    def handle_ocp_media_state(self, message: Message):
-        LOG.info(f"media state: {message.data}")
-        state = message.data["state"]
-        if state == MediaState.END_OF_MEDIA:
-            self._state = MediaPlayerState.IDLE
-            self.schedule_update_ha_state()
+    def handle_state_change(self, changed: Set[str]):
+        self._update_state(changed)
+        self.schedule_update_ha_state()
 
-    def handle_ocp_player_state(self, message: Message):
-        LOG.info(f"player state: {message.data}")
-        state = message.data["state"]
-        if state == PlayerState.PAUSED:
-            self._state = MediaPlayerState.PAUSED
-        elif state == PlayerState.PLAYING:
-            self._state = MediaPlayerState.PLAYING
-        elif state == PlayerState.STOPPED:
+    def _update_state(self, changed: Set[str]):
+        state = self.bus.device_state
+        if "player_state" in changed:
+            player = state["player_state"]
+            if player == PlayerState.PAUSED:
+                self._state = MediaPlayerState.PAUSED
+            elif player == PlayerState.PLAYING:
+                self._state = MediaPlayerState.PLAYING
+            elif player == PlayerState.STOPPED:
+                self._state = MediaPlayerState.IDLE
+        if "media_state" in changed and state["media_state"] == MediaState.END_OF_MEDIA:
             self._state = MediaPlayerState.IDLE
-        self.schedule_update_ha_state()
+            self._playback_pos = self._track.length
 
-    def handle_volume_update(self, message: Message):
-        LOG.info(f"volume state: {message.data}")
-        self._volume_level = message.data["percent"]
-        self._is_muted = message.data["muted"]
-        self.schedule_update_ha_state()
+    def _set_track(self, uri: str, track: TrackMetadata) -> bool:
+        """Show the metadata of a track, returns if anything changed"""
+        if uri == self._uri and track == self._track:
+            return False
+        self._uri, self._track = uri, track
+        return True
 
     def handle_track_info(self, message: Message):
-        LOG.info(f"track info: {message.data}")
-        self._track_title = message.data.get("title") or message.data.get("track")
-        self._track_artist = message.data.get("artist")
-        self._track_artist = message.data.get("album")
-        self._image = message.data.get("image")
-        self._uri = message.data.get("uri")
-        self.schedule_update_ha_state()
-
-    def handle_track_len(self, message: Message):
-        LOG.info(f"track info: {message.data}")
-        self._track_len = message.data["length"]
-        self.schedule_update_ha_state()
-
-    def handle_track_pos(self, message: Message):
-        LOG.info(f"track info: {message.data}")
-        self._playback_pos = message.data["position"]
-        if "length" in message.data:
-            self._track_len = message.data["length"]
-        self.schedule_update_ha_state()
-
-    def handle_status(self, message: Message):
-        LOG.info(f"OCP status: {message.data}")
-        player = message.data["state"]
-        media = message.data["media_state"]
-        repeat = message.data["repeat"]
-        self._is_shuffle = message.data["shuffle"]
-
-        if repeat == LoopState.REPEAT:
-            self._repeat = RepeatMode.ALL
-        elif repeat == LoopState.REPEAT_TRACK:
-            self._repeat = RepeatMode.ONE
+        uri = message.data.get("uri") or ""
+        fields = dict(title=message.data.get("title") or message.data.get("track"),
+                      artist=message.data.get("artist"),
+                      album=message.data.get("album"),
+                      image=message.data.get("image"))
+        if uri:
+            # a track seen before keeps the length and anything else this response lacks
+            track = self._tracks.update(uri, **fields)
         else:
-            self._repeat = RepeatMode.OFF
+            track = TrackMetadata(**{k: v or "" for k, v in fields.items()})
+        if self._set_track(uri, track):
+            self.schedule_update_ha_state()
 
-        if player == PlayerState.PAUSED:
-            self._state = MediaPlayerState.PAUSED
-        elif player == PlayerState.PLAYING:
-            self._state = MediaPlayerState.PLAYING
-        elif player == PlayerState.STOPPED:
-            self._state = MediaPlayerState.IDLE
+    def _set_length(self, length: int) -> bool:
+        if not length or length == self._track.length:
+            return False
+        if self._uri:
+            self._tracks.update(self._uri, length=length)
+        self._track = self._track._replace(length=length)
+        return True
 
-        if media == MediaState.END_OF_MEDIA:
-            self._state = MediaPlayerState.IDLE
-            self._playback_pos = self._track_len
+    def handle_track_len(self, message: Message):
+        if self._set_length(message.data["length"]):
+            self.schedule_update_ha_state()
 
-        self.schedule_update_ha_state()
+    def handle_track_pos(self, message: Message):
+        changed = self._set_length(message.data.get("length"))
+        if message.data["position"] != self._playback_pos:
+            self._playback_pos = message.data["position"]
+            changed = True
+        if changed:
+            self.schedule_update_ha_state()
 
     def register_events(self):
         self.bus.on_mycroft("ovos.common_play.track_info.response",
@@ -175,44 +167,45 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
                             self.handle_track_len)
         self.bus.on_mycroft("ovos.common_play.get_track_position.response",
                             self.handle_track_pos)
-        self.bus.on_mycroft("mycroft.volume.get.response",
-                            self.handle_volume_update)
         self.bus.on_mycroft("ovos.common_play.playback_time",
                             self.handle_track_pos)
 
-        self.bus.on_mycroft("ovos.common_play.track.state",
-                            self.handle_ocp_track_state)
-        self.bus.on_mycroft("ovos.common_play.player.state",
-                            self.handle_ocp_player_state)
-        self.bus.on_mycroft("ovos.common_play.media.state",
-                            self.handle_ocp_media_state)
-        self.bus.on_mycroft("ovos.common_play.player.status.response",
-                            self.handle_status)
-
-    async def async_update(self):
-        self.send_to_ovos(Message("mycroft.volume.get"))
-        self.send_to_ovos(Message("ovos.common_play.track_info"))
-        self.send_to_ovos(Message("ovos.common_play.get_track_length"))
-        self.send_to_ovos(Message("ovos.common_play.get_track_position"))
-        self.send_to_ovos(Message("ovos.common_play.player.status"))
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._update_state({"player_state", "media_state"})
+
+    def restored_fields(self, state: State) -> dict:
+        fields = {}
+        if state.state in RESTORED_PLAYER_STATES:
+            fields["player_state"] = RESTORED_PLAYER_STATES[state.state]
+        attributes = state.attributes
+        if attributes.get(ATTR_MEDIA_VOLUME_LEVEL) is not None:
+            fields["volume"] = attributes[ATTR_MEDIA_VOLUME_LEVEL]
+        if attributes.get(ATTR_MEDIA_VOLUME_MUTED) is not None:
+            fields["muted"] = attributes[ATTR_MEDIA_VOLUME_MUTED]
+        if attributes.get(ATTR_MEDIA_SHUFFLE) is not None:
+            fields["shuffle"] = attributes[ATTR_MEDIA_SHUFFLE]
+        if attributes.get(ATTR_MEDIA_REPEAT) in RESTORED_LOOP_STATES:
+            fields["loop_state"] = RESTORED_LOOP_STATES[attributes[ATTR_MEDIA_REPEAT]]
+        return fields
+
+    def poll_messages(self) -> List[Message]:
+        messages = [Message("mycroft.volume.get"),
+                    Message("ovos.common_play.player.status")]
+        if self.bus.device_state["player_state"] not in (PlayerState.PLAYING, PlayerState.PAUSED):
+            # nothing loaded, the player status reports when a track starts
+            return messages
+        messages.append(Message("ovos.common_play.track_info"))
+        if not self._track.length:
+            # cached for tracks seen before, and sent along with every playback_time update
+            messages.append(Message("ovos.common_play.get_track_length"))
+        messages.append(Message("ovos.common_play.get_track_position"))
+        return messages
 
     @property
     def available(self) -> bool:
         return self.bus.handshake_event.is_set()
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -224,10 +217,8 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
         return f"hm-ocp-{self._name}-{self.site_id}".replace(" ", "")
 
     def send_to_ovos(self, message: Message):
-        payload = HiveMessage(HiveMessageType.BUS, message)
         try:
-            LOG.info(f"HiveMind Message: {payload.serialize()}")
-            self.bus.emit(payload)
+            self.bus.emit(message)
         except Exception as e:
             LOG.error(f"Error from HiveMind messagebus: {e}")
 
@@ -247,42 +238,47 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
     @property
     def volume_level(self) -> float:
         """via ovos-PHAL-plugin-alsa"""
-        return self._volume_level
+        return self.bus.device_state["volume"]
 
     @property
     def is_volume_muted(self) -> bool:
         """via ovos-PHAL-plugin-alsa"""
-        return self._is_muted
+        return self.bus.device_state["muted"]
 
     @property
     def shuffle(self) -> bool:
         """True if shuffle is enabled."""
-        return self._is_shuffle
+        return self.bus.device_state["shuffle"]
 
     @property
     def repeat(self) -> RepeatMode:
         """Current repeat mode."""
-        return self._repeat
+        loop = self.bus.device_state["loop_state"]
+        if loop == LoopState.REPEAT:
+            return RepeatMode.ALL
+        if loop == LoopState.REPEAT_TRACK:
+            return RepeatMode.ONE
+        return RepeatMode.OFF
 
     @property
     def media_album_artist(self) -> str:
         """	Album artist of current playing media, music track only."""
-        return self._track_title
+        return self._track.title
 
     @property
     def media_album_name(self) -> str:
         """Album name of current playing media, music track only."""
-        return self._track_album
+        return self._track.album
 
     @property
     def media_artist(self) -> str:
         """Artist of current playing media, music track only."""
-        return self._track_artist
+        return self._track.artist
 
     @property
     def media_channel(self) -> str:
         """Channel currently playing."""
-        return self._track_title
+        return self._track.title
 
     @property
     def media_content_id(self) -> str:
@@ -297,12 +293,12 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
     @property
     def media_duration(self) ->int:
         """Duration of current playing media in seconds."""
-        return self._track_len
+        return self._track.length
 
     @property
     def media_episode(self) -> str:
         """Episode of current playing media, TV show only."""
-        return self._track_title
+        return self._track.title
 
     @property
     def media_image_remotely_accessible(self) -> bool:
@@ -312,7 +308,7 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
     @property
     def media_image_url(self) -> str:
         """	Image URL of current playing media."""
-        return self._image
+        return self._track.image
 
     @property
     def media_playlist(self) -> str:
@@ -332,12 +328,12 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
     @property
     def media_series_title(self) -> str:
         """Title of series of current playing media, TV show only."""
-        return self._track_title
+        return self._track.title
 
     @property
     def media_title(self) -> str:
         """Title of current playing media."""
-        return self._track_title
+        return self._track.title
 
     @property
     def media_track(self) -> int:
@@ -359,9 +355,14 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
         if media_source.is_media_source_id(media_id):
             media_type = MediaType.MUSIC
             play_item = await media_source.async_resolve_media(self.hass, media_id, self.entity_id)
-            # play_item returns a relative URL if it has to be resolved on the Home Assistant host
-            # This call will turn it into a full URL
-            media_id = async_process_play_media_url(self.hass, play_item.url)
+            local_path = local_media_path(self.hass, play_item.url) if self.stream_media else None
+            if local_path:
+                # push the file over the HiveMind connection, the satellite may not reach this host
+                media_id = await self.hass.async_add_executor_job(stream_file, self.bus, local_path)
+            else:
+                # play_item returns a relative URL if it has to be resolved on the Home Assistant host
+                # This call will turn it into a full URL
+                media_id = async_process_play_media_url(self.hass, play_item.url)
 
         # Replace this with calling your media player play media function.
         #await self._media_player.play_url(media_id)
@@ -375,41 +376,45 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
         else: # REPLACE / PLAY / NEXT
             m = "ovos.common_play.play"
 
-        self._uri = media_id
+        # metadata Home Assistant knows about the media, e.g. from the media browser
+        extra = kwargs.get("extra") or {}
+        track = self._tracks.update(media_id, title=extra.get("title"), image=extra.get("thumb"))
         if self.legacy_audioservice:
             message = Message('mycroft.audio.service.play',
                               {'tracks': [media_id]})
         else:
             entry = MediaEntry(
                 uri=media_id,
-                title="",
-                artist="",
-                length=0,
+                title=track.title,
+                artist=track.artist,
+                length=track.length,
                 match_confidence=100,
                 skill_id="homeassistant.hivemind",
                 skill_icon="https://raw.githubusercontent.com/home-assistant/brands/refs/heads/master/core_integrations/music_assistant/icon.png",
-                image="",
+                image=track.image,
                 status=TrackState.QUEUED_AUDIO,
                 media_type=mapping.get(media_type, OCPMediaType.MUSIC),
                 playback=PlaybackType.AUDIO,
             )
             message = Message(m, {"media": entry.as_dict})
         self.send_to_ovos(message)
+        if m == "ovos.common_play.play" and self._set_track(media_id, track):
+            # known tracks show their metadata now instead of after the next poll
+            self.async_write_ha_state()
 
 
     async def async_media_play(self):
         """Send play command."""
-        self._state = STATE_PLAYING
         if self.legacy_audioservice:
             message = Message('mycroft.audio.service.resume')
         else:
             message = Message('ovos.common_play.resume')
         LOG.info(f"play")
         self.send_to_ovos(message)
-        self.async_write_ha_state()
+        # optimistic, written only if the known state changes
+        self.bus.device_state.set_optimistic(player_state=PlayerState.PLAYING)
 
     async def async_media_pause(self):
-        self._state = STATE_PAUSED
         LOG.info(f"pause")
         if self.legacy_audioservice:
             message = Message('mycroft.audio.service.pause')
@@ -417,10 +422,9 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
             message = Message('ovos.common_play.pause')
 
         self.send_to_ovos(message)
-        self.async_write_ha_state()
+        self.bus.device_state.set_optimistic(player_state=PlayerState.PAUSED)
 
     async def async_media_stop(self):
-        self._state = STATE_IDLE
         LOG.info(f"stop")
         if self.legacy_audioservice:
             message = Message('mycroft.audio.service.stop')
@@ -428,41 +432,37 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
             message = Message('ovos.common_play.stop')
 
         self.send_to_ovos(message)
-        self.async_write_ha_state()
+        self.bus.device_state.set_optimistic(player_state=PlayerState.STOPPED)
 
     async def async_set_volume_level(self, volume):
         """via ovos-PHAL-plugin-alsa"""
-        self._volume_level = volume
         LOG.info(f"volume: {volume}")
         message = Message("mycroft.volume.set",
                           {"percent": volume})
 
         self.send_to_ovos(message)
-        self.async_write_ha_state()
+        self.bus.device_state.set_optimistic(volume=volume)
 
     async def async_volume_up(self):
         """via ovos-PHAL-plugin-alsa"""
-        self._volume_level += 0.1
-        self._volume_level = min(self._volume_level, 1.0)
-        LOG.info(f"volume: {self._volume_level}")
+        volume = min(self.volume_level + 0.1, 1.0)
+        LOG.info(f"volume: {volume}")
         message = Message("mycroft.volume.increase")
 
         self.send_to_ovos(message)
-        self.async_write_ha_state()
+        self.bus.device_state.set_optimistic(volume=volume)
 
     async def async_volume_down(self):
         """via ovos-PHAL-plugin-alsa"""
-        self._volume_level -= 0.1
-        self._volume_level = max(self._volume_level, 0)
-        LOG.info(f"volume: {self._volume_level}")
+        volume = max(self.volume_level - 0.1, 0)
+        LOG.info(f"volume: {volume}")
         message = Message("mycroft.volume.decrease")
 
         self.send_to_ovos(message)
-        self.async_write_ha_state()
+        self.bus.device_state.set_optimistic(volume=volume)
 
     async def async_mute_volume(self, mute):
         """via ovos-PHAL-plugin-alsa"""
-        self._is_muted = mute
         LOG.info(f"set mute: {mute}")
         if mute:
             message = Message("mycroft.volume.mute")
@@ -470,7 +470,7 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
             message = Message("mycroft.volume.unmute")
 
         self.send_to_ovos(message)
-        self.async_write_ha_state()
+        self.bus.device_state.set_optimistic(muted=mute)
 
     async def async_media_previous_track(self) -> None:
         """Send previous track command."""
@@ -480,7 +480,6 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
             message = Message('ovos.common_play.previous')
         LOG.info("previous track")
         self.send_to_ovos(message)
-        self.async_write_ha_state()
 
     async def async_media_next_track(self) -> None:
         """Send next track command."""
@@ -491,7 +490,6 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
         else:
             message = Message('ovos.common_play.next')
         self.send_to_ovos(message)
-        self.async_write_ha_state()
 
     async def async_media_seek(self, position: float) -> None:
         """Send seek command."""
@@ -511,7 +509,6 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
         message = Message('ovos.common_play.playlist.clear')
         self.send_to_ovos(message)
         LOG.info(f"clear playlist")
-        self.async_write_ha_state()
 
     async def async_set_shuffle(self, shuffle: bool) -> None:
         """Enable/disable shuffle mode."""
@@ -522,22 +519,23 @@ class HiveMindMediaPlayer(MediaPlayerEntity):
 
         LOG.info(f"set shuffle: {shuffle}")
         self.send_to_ovos(message)
-        self._is_shuffle = shuffle
-        self.async_write_ha_state()
+        self.bus.device_state.set_optimistic(shuffle=shuffle)
 
     async def async_set_repeat(self, repeat: RepeatMode) -> None:
         """Set repeat mode."""
         if repeat == RepeatMode.OFF: # no repeat
             message = Message('ovos.common_play.repeat.unset')
+            loop = LoopState.NONE
         elif repeat == RepeatMode.ALL: # repeat playlist in loop
             message = Message('ovos.common_play.repeat.set')
+            loop = LoopState.REPEAT
         else: # repeat same track in loop
             message = Message('ovos.common_play.repeat.one')
+            loop = LoopState.REPEAT_TRACK
 
         LOG.info(f"set repeat: {repeat}")
-        self._repeat = repeat
         self.send_to_ovos(message)
-        self.async_write_ha_state()
+        self.bus.device_state.set_optimistic(loop_state=loop)
 
 async def async_setup_entry(
         hass: HomeAssistant,
@@ -549,13 +547,15 @@ async def async_setup_entry(
     name = entry.data.get("name", "unnamed device")
     site_id = entry.data.get("site_id", "unknown")
     legacy_audio = entry.data.get("legacy_audio", False)
+    stream_media = entry.options.get(CONF_STREAM_MEDIA, False)
 
     # Create the connection button entity
     connection_button = HiveMindMediaPlayer(
         bus=entry.hm_bus,
         name=name,
         site_id=site_id,
-        legacy_audio=legacy_audio
+        legacy_audio=legacy_audio,
+        stream_media=stream_media
     )
 
     # Add it to Home Assistant
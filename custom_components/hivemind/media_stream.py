@@ -0,0 +1,70 @@
+"""Push Home Assistant local media files to satellites over the HiveMind connection"""
+import os
+import posixpath
+from collections import deque
+from typing import Optional
+from urllib.parse import unquote, urlparse
+from uuid import uuid4
+
+from hivemind_bus_client.message import HiveMessage, HiveMessageType, HiveMindBinaryPayloadType
+from homeassistant.core import HomeAssistant
+from ovos_utils.log import LOG
+
+MEDIA_CHUNK_SIZE = 64 * 1024
+MEDIA_WINDOW = 8  # frames queued for the socket before the reader waits, bounds the memory per stream
+SATELLITE_MEDIA_DIR = "/tmp/hivemind_media"  # where the satellite writes received files, see README
+
+
+def local_media_path(hass: HomeAssistant, url: str) -> Optional[str]:
+    """Return the file behind a /media/<source_dir>/<path> url resolved by media_source, if any"""
+    path = urlparse(url).path
+    if not path.startswith("/media/"):
+        return None
+    source_dir_id, _, location = unquote(path[len("/media/"):]).partition("/")
+    base = hass.config.media_dirs.get(source_dir_id)
+    if base is None:
+        return None
+    base = os.path.realpath(base)
+    full_path = os.path.realpath(os.path.join(base, location))
+    if not full_path.startswith(base + os.sep):
+        return None
+    return full_path
+
+
+def stream_file(bus, path: str) -> str:
+    """Send a file as a sequence of binary FILE frames, blocking until the last one is written
+
+    frames carry ``file_name``, ``path``, ``stream_id``, ``offset``, ``size`` and ``end`` metadata,
+    the satellite writes each frame at ``offset`` of ``path``. At most MEDIA_WINDOW frames wait
+    for the socket at a time
+
+    Returns the file:// URI of ``path``, for OCP on the satellite
+    """
+    file_name = os.path.basename(path)
+    stream_id = uuid4().hex
+    # one directory per stream, files with the same name never overwrite a playing one
+    remote_path = posixpath.join(SATELLITE_MEDIA_DIR, stream_id, file_name)
+    size = os.path.getsize(path)
+    offset = 0
+    in_flight = deque()
+    LOG.info(f"Streaming {path} to HiveMind ({size} bytes)")
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            # encoding copies the payload again, reading into reused buffers would save nothing
+            payload = f.read(MEDIA_CHUNK_SIZE)
+            n = len(payload)
+            end = not n or offset + n >= size
+            metadata = {"file_name": file_name, "path": remote_path, "stream_id": stream_id,
+                        "offset": offset, "size": size, "end": end}
+            in_flight.append(bus.emit(HiveMessage(HiveMessageType.BINARY, payload=payload,
+                                                  bin_type=HiveMindBinaryPayloadType.FILE,
+                                                  metadata=metadata),
+                                      binary_type=HiveMindBinaryPayloadType.FILE))
+            if len(in_flight) >= MEDIA_WINDOW:
+                in_flight.popleft().result()
+            offset += n
+            if end:
+                break
+    for future in in_flight:
+        future.result()
+    return f"file://{remote_path}"
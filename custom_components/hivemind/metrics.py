@@ -0,0 +1,112 @@
+"""Prometheus metrics of the HiveMind connections"""
+from typing import Dict, Iterable, List
+
+from aiohttp import web
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+
+from .const import DOMAIN
+from .stats import Histogram
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+
+
+class MetricsWriter:
+    """Prometheus text exposition, one HELP and TYPE header per metric family"""
+
+    def __init__(self):
+        self._families: Dict[str, List[str]] = {}
+        self._headers: Dict[str, str] = {}
+
+    def _family(self, name: str, kind: str, doc: str) -> List[str]:
+        if name not in self._families:
+            self._headers[name] = f"# HELP {name} {doc}\n# TYPE {name} {kind}"
+            self._families[name] = []
+        return self._families[name]
+
+    def sample(self, name: str, kind: str, doc: str, labels: Dict[str, str], value):
+        self._family(name, kind, doc).append(f"{name}{{{_labels(labels)}}} {value}")
+
+    def histogram(self, name: str, doc: str, labels: Dict[str, str], histogram: Histogram):
+        lines = self._family(name, "histogram", doc)
+        base = _labels(labels)
+        for bound, count in histogram.cumulative():
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{base},le="{le}"}} {count}')
+        lines.append(f"{name}_sum{{{base}}} {histogram.sum}")
+        lines.append(f"{name}_count{{{base}}} {histogram.count}")
+
+    def render(self) -> str:
+        return "".join(f"{self._headers[name]}\n" + "".join(f"{line}\n" for line in lines)
+                       for name, lines in self._families.items())
+
+
+def render_metrics(entries: Iterable) -> str:
+    """Render the counters of every loaded entry
+
+    counters are read without locks from shallow copies, like the diagnostics,
+    a scrape may be one message behind the bus thread
+    """
+    out = MetricsWriter()
+    for entry in entries:
+        bus = getattr(entry, "hm_bus", None)
+        if bus is None:
+            continue
+        stats = bus.stats
+        device = {"entry_id": entry.entry_id, "site_id": bus.site_id or ""}
+        out.sample("hivemind_connected", "gauge", "1 while the HiveMind handshake is complete",
+                   device, int(bus.handshake_event.is_set()))
+        out.sample("hivemind_reconnects_total", "counter", "Reconnection attempts",
+                   device, stats.reconnects)
+        for msg_type, count in dict(stats.messages_in).items():
+            out.sample("hivemind_messages_in_total", "counter", "Messages received by type",
+                       {**device, "type": msg_type}, count)
+        for msg_type, count in dict(stats.messages_out).items():
+            out.sample("hivemind_messages_out_total", "counter", "Messages sent by type",
+                       {**device, "type": msg_type}, count)
+        out.sample("hivemind_received_bytes_total", "counter", "Websocket payload bytes received",
+                   device, stats.bytes_in)
+        out.sample("hivemind_sent_bytes_total", "counter", "Websocket bytes written",
+                   device, stats.bytes_out)
+        for msg_type, histogram in dict(stats.handler_time).items():
+            out.histogram("hivemind_handler_seconds", "Bus handler execution time",
+                          {**device, "type": msg_type}, histogram)
+        for msg_type, histogram in dict(stats.request_rtt).items():
+            out.histogram("hivemind_request_rtt_seconds", "Time from a request to its response",
+                          {**device, "type": msg_type}, histogram)
+        for command, histogram in dict(bus.latency.latency).items():
+            out.histogram("hivemind_command_confirm_seconds", "Time for the device to confirm a command",
+                          {**device, "type": command}, histogram)
+        for command, count in dict(bus.latency.failures).items():
+            out.sample("hivemind_command_failures_total", "counter", "Commands not confirmed in time",
+                       {**device, "type": command}, count)
+        out.sample("hivemind_poll_requests_total", "counter", "Queries sent by the poller",
+                   device, bus.poller.requests)
+        queues = {**bus.queue_depths,
+                  **{f"lane_{lane}": depth for lane, depth in bus.sender.as_dict()["lanes"].items()}}
+        for queue, depth in queues.items():
+            out.sample("hivemind_queue_depth", "gauge", "Messages waiting in a queue",
+                       {**device, "queue": queue}, depth)
+        for entity_id, count in dict(stats.state_writes).items():
+            out.sample("hivemind_state_writes_total", "counter", "Home Assistant state writes by entity",
+                       {**device, "entity_id": entity_id or ""}, count)
+    return out.render()
+
+
+class HiveMindMetricsView(HomeAssistantView):
+    """Prometheus scrape endpoint, authenticated with a long lived access token"""
+
+    url = "/api/hivemind/metrics"
+    name = "api:hivemind:metrics"
+
+    async def get(self, request: web.Request) -> web.Response:
+        hass = request.app[KEY_HASS]
+        body = render_metrics(hass.data.get(DOMAIN, {}).values())
+        return web.Response(body=body.encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
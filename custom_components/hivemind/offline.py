@@ -0,0 +1,118 @@
+"""Hold commands emitted while a HiveMind device is disconnected"""
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+OFFLINE_QUEUE_SIZE = 100  # commands held per device, the oldest is dropped when full
+DEFAULT_COMMAND_TTL = 30  # seconds a command without its own policy is worth sending late
+
+# message type -> (coalescing group, ttl in seconds)
+# a held command replaces the previous one of its group, a ttl of 0 is never held
+COMMAND_POLICIES: Dict[str, Tuple[Optional[str], float]] = {
+    # queries are answered with stale state at best, polling resumes after the handshake
+    "mycroft.volume.get": (None, 0),
+    "mycroft.mic.get_status": (None, 0),
+    "mycroft.audio.speak.status": (None, 0),
+    "recognizer_loop:state.get": (None, 0),
+    "system.ssh.status": (None, 0),
+    "ovos.common_play.track_info": (None, 0),
+    "ovos.common_play.get_track_length": (None, 0),
+    "ovos.common_play.get_track_position": (None, 0),
+    "ovos.common_play.player.status": (None, 0),
+    # surprising when replayed long after they were requested
+    "system.reboot": (None, 0),
+    "system.shutdown": (None, 0),
+    "system.mycroft.service.restart": (None, 0),
+    "mycroft.mic.listen": (None, 5),
+    "mycroft.stop": (None, 5),
+    # relative steps add up, every press is sent
+    "mycroft.volume.increase": (None, 10),
+    "mycroft.volume.decrease": (None, 10),
+    # the conversation agent stops waiting for the reply after 15 seconds
+    "recognizer_loop:utterance": (None, 10),
+    # only the last state requested matters
+    "mycroft.volume.set": ("volume", 60),
+    "mycroft.volume.mute": ("mute", 60),
+    "mycroft.volume.unmute": ("mute", 60),
+    "mycroft.mic.mute": ("mic", 60),
+    "mycroft.mic.unmute": ("mic", 60),
+    "system.ssh.enable": ("ssh", 60),
+    "system.ssh.disable": ("ssh", 60),
+    "recognizer_loop:sleep": ("listener", 60),
+    "recognizer_loop:wake_up": ("listener", 60),
+    "recognizer_loop:state.set": ("listener", 60),
+    "ovos.common_play.resume": ("playback", 30),
+    "ovos.common_play.pause": ("playback", 30),
+    "ovos.common_play.stop": ("playback", 30),
+    "mycroft.audio.service.resume": ("playback", 30),
+    "mycroft.audio.service.pause": ("playback", 30),
+    "mycroft.audio.service.stop": ("playback", 30),
+    "ovos.common_play.play": ("play_media", 60),
+    "mycroft.audio.service.play": ("play_media", 60),
+    "ovos.common_play.set_track_position": ("seek", 30),
+    "mycroft.audio.service.set_track_position": ("seek", 30),
+    "ovos.common_play.shuffle.set": ("shuffle", 60),
+    "ovos.common_play.shuffle.unset": ("shuffle", 60),
+    "ovos.common_play.repeat.set": ("repeat", 60),
+    "ovos.common_play.repeat.unset": ("repeat", 60),
+    "ovos.common_play.repeat.one": ("repeat", 60),
+}
+
+
+def command_policy(msg_type: str) -> Tuple[Optional[str], float]:
+    return COMMAND_POLICIES.get(msg_type, (None, DEFAULT_COMMAND_TTL))
+
+
+class OfflineQueue:
+    """Ordered commands waiting for the handshake, with per type expiry and coalescing
+
+    not thread safe, the owner serializes access
+    """
+
+    def __init__(self, size: int = OFFLINE_QUEUE_SIZE):
+        self.size = size
+        self.coalesced = 0
+        self.expired = 0
+        self.dropped = 0
+        self._held = OrderedDict()  # coalescing key -> (expires, msg_type, item)
+        self._ids = itertools.count()
+
+    def __len__(self):
+        return len(self._held)
+
+    def hold(self, msg_type: str, item: Any) -> Tuple[bool, List[Any]]:
+        """Hold a command, returns if it was held and the items it made obsolete"""
+        group, ttl = command_policy(msg_type)
+        if ttl <= 0:
+            return False, []
+        obsolete = []
+        key = group if group is not None else next(self._ids)
+        previous = self._held.pop(key, None)
+        if previous is not None:
+            self.coalesced += 1
+            obsolete.append(previous[2])
+        self._held[key] = (time.monotonic() + ttl, msg_type, item)
+        while len(self._held) > self.size:
+            self.dropped += 1
+            obsolete.append(self._held.popitem(last=False)[1][2])
+        return True, obsolete
+
+    def flush(self) -> Tuple[List[Any], List[Any]]:
+        """Empty the queue, returns the items still worth sending in order and the expired ones"""
+        now = time.monotonic()
+        items, expired = [], []
+        for expires, msg_type, item in self._held.values():
+            if expires < now:
+                expired.append(item)
+            else:
+                items.append(item)
+        self._held.clear()
+        self.expired += len(expired)
+        return items, expired
+
+    def as_dict(self) -> dict:
+        return {"held": len(self._held),
+                "coalesced": self.coalesced,
+                "expired": self.expired,
+                "dropped": self.dropped}
@@ -0,0 +1,320 @@
+"""Outbound message pipeline of a HiveMind connection"""
+import time
+from collections import deque
+from concurrent.futures import Future
+from threading import Condition, Lock, Thread
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+from hivemind_bus_client.encryption import encrypt_as_json, encrypt_bin
+from hivemind_bus_client.message import HiveMessage, HiveMessageType
+from hivemind_bus_client.serialization import HiveMindBinaryPayloadType, get_bitstring
+from ovos_utils.log import LOG
+from websocket import ABNF, WebSocketConnectionClosedException
+
+from .codec import json_dumps
+from .const import ECHO_CONTEXT
+from .offline import OfflineQueue, command_policy
+
+CONNECT_POLL_INTERVAL = 1  # seconds between checks for shutdown and expiry while waiting for the handshake
+
+PRIORITY_CONTROL = 0  # commands people are waiting on
+PRIORITY_TTS = 1
+PRIORITY_BULK = 2  # state queries, polling and binary transfers
+LANE_NAMES = ("control", "tts", "bulk")
+STARVATION_LIMIT = 8  # sends a waiting lane can be passed over before it is served
+MAX_BATCH = 32  # frames joined into one socket write
+MAX_BATCH_BYTES = 256 * 1024
+
+TTS_TYPES = {"speak"}
+QUERY_SUFFIXES = (".get", ".status", ".get_status", ".is_alive", ".is_ready", ".track_info",
+                  ".get_track_length", ".get_track_position")
+
+
+def message_priority(message: HiveMessage, msg_type: str) -> int:
+    if message.msg_type == HiveMessageType.BINARY:
+        return PRIORITY_BULK
+    if msg_type in TTS_TYPES:
+        return PRIORITY_TTS
+    if msg_type.endswith(QUERY_SUFFIXES):
+        return PRIORITY_BULK
+    return PRIORITY_CONTROL
+
+
+class OutboundItem(NamedTuple):
+    message: HiveMessage
+    binary_type: HiveMindBinaryPayloadType
+    future: Future
+    priority: int
+
+
+class PriorityLanes:
+    """Blocking queue with one FIFO lane per priority
+
+    higher priority lanes are always served first, except that a non empty lane passed
+    over STARVATION_LIMIT times is served next. A batch only holds items of one lane, so a
+    control message queued while a batch is written waits for that batch, at most MAX_BATCH
+    frames or MAX_BATCH_BYTES of a single lane, and then behind at most one starved message
+    per lower lane
+    """
+
+    def __init__(self, lanes: int = len(LANE_NAMES)):
+        self._lanes = [deque() for _ in range(lanes)]
+        self._skipped = [0] * lanes
+        self._cond = Condition()
+        self._closed = False
+        self.starvation_grants = 0
+
+    def __len__(self):
+        return sum(len(lane) for lane in self._lanes)
+
+    def depths(self) -> List[int]:
+        return [len(lane) for lane in self._lanes]
+
+    def put(self, item: OutboundItem):
+        with self._cond:
+            self._lanes[item.priority].append(item)
+            self._cond.notify()
+
+    def get_batch(self, max_items: int) -> List[OutboundItem]:
+        """Items of one lane to send in order, blocks while empty and returns an empty list once closed"""
+        with self._cond:
+            while not self._closed and not any(self._lanes):
+                self._cond.wait()
+            if self._closed:
+                return []
+            priority, starved = self._next_lane()
+            items = [self._pop(priority, starved)]
+            while len(items) < max_items:
+                next_priority, starved = self._next_lane()
+                if next_priority != priority:
+                    break
+                items.append(self._pop(priority, starved))
+            return items
+
+    def _next_lane(self) -> Tuple[Optional[int], bool]:
+        """Lane served next and if it is served because it starved"""
+        # lowest lanes first, so the one waiting the longest is served when several starve
+        for priority in range(len(self._lanes) - 1, 0, -1):
+            if self._lanes[priority] and self._skipped[priority] >= STARVATION_LIMIT:
+                return priority, True
+        for priority, lane in enumerate(self._lanes):
+            if lane:
+                return priority, False
+        return None, False
+
+    def _pop(self, priority: int, starved: bool) -> OutboundItem:
+        if starved:
+            self.starvation_grants += 1
+        else:
+            for lower in range(priority + 1, len(self._lanes)):
+                if self._lanes[lower]:
+                    self._skipped[lower] += 1
+        self._skipped[priority] = 0
+        return self._lanes[priority].popleft()
+
+    def close(self) -> List[OutboundItem]:
+        """Wake the consumer and return the items that will not be sent"""
+        with self._cond:
+            self._closed = True
+            items = [item for lane in self._lanes for item in lane]
+            for lane in self._lanes:
+                lane.clear()
+            self._cond.notify_all()
+        return items
+
+
+class OutboundSender:
+    """Serialize, encrypt and write the outbound messages of a connection on a worker thread
+
+    callers only enqueue, so emitting from the event loop never runs JSON encoding or crypto.
+    Every message is encoded exactly once, right before it is written, in submission order
+    within its priority lane. Bus messages submitted while the handshake is down are held in
+    an OfflineQueue until flush
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+        self.offline = OfflineQueue()
+        self._lanes = PriorityLanes()
+        self._lock = Lock()
+        self._online = False  # held commands were flushed since the last handshake
+        self._closed = False
+        self._thread = Thread(target=self._run, name="hivemind-sender", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Messages submitted but not yet written to the socket"""
+        return len(self._lanes)
+
+    def submit(self, message: HiveMessage, msg_type: str,
+               binary_type: HiveMindBinaryPayloadType = HiveMindBinaryPayloadType.UNDEFINED) -> Future:
+        """Queue a message, the returned future resolves once it is written"""
+        future = Future()
+        item = OutboundItem(message, binary_type, future, message_priority(message, msg_type))
+        if self._closed:
+            future.set_exception(ConnectionError("HiveMind connection is closed"))
+            return future
+        with self._lock:
+            if self._online and self.bus.handshake_event.is_set():
+                self._lanes.put(item)
+                return future
+            self._online = False
+            if message.msg_type == HiveMessageType.BUS:
+                held, obsolete = self.offline.hold(msg_type, item)
+            else:
+                held, obsolete = False, []
+        for superseded in obsolete:
+            superseded.future.cancel()
+        if not held:
+            LOG.debug(f"HiveMind is disconnected, dropping {msg_type}")
+            future.set_exception(ConnectionError("HiveMind is disconnected"))
+        return future
+
+    def flush(self):
+        """Queue the held commands that did not expire, called when the handshake completes"""
+        with self._lock:
+            items, expired = self.offline.flush()
+            for item in items:
+                self._lanes.put(item)
+            self._online = True
+        for item in expired:
+            item.future.set_exception(ConnectionError("HiveMind command expired before reconnecting"))
+        if items or expired:
+            LOG.info(f"Sending {len(items)} commands held while disconnected, {len(expired)} expired")
+
+    def close(self, timeout: float = 5):
+        self._closed = True
+        with self._lock:
+            items, expired = self.offline.flush()
+        # fail whatever was not sent instead of leaving callers waiting
+        for item in items + expired + self._lanes.close():
+            if item.future.set_running_or_notify_cancel():
+                item.future.set_exception(ConnectionError("HiveMind connection is closed"))
+        self._thread.join(timeout)
+
+    def as_dict(self) -> dict:
+        return {"lanes": dict(zip(LANE_NAMES, self._lanes.depths())),
+                "starvation_grants": self._lanes.starvation_grants,
+                "offline": self.offline.as_dict()}
+
+    def encode(self, message: HiveMessage,
+               binary_type: HiveMindBinaryPayloadType) -> Tuple[Union[str, bytes], int]:
+        """Return the websocket payload and opcode of a message, encrypted with the session key"""
+        bus = self.bus
+        if message.msg_type == HiveMessageType.BINARY:
+            binarize = True
+        else:
+            binarize = bus.protocol.binarize and bus.binarize
+        if binarize:
+            bitstr = get_bitstring(hive_type=message.msg_type,
+                                   payload=message.payload,
+                                   compressed=bus.compress,
+                                   binary_type=binary_type,
+                                   hivemeta=message.metadata)
+            if bus.crypto_key:
+                return encrypt_bin(bus.crypto_key, bitstr.bytes, cipher=bus.cipher), ABNF.OPCODE_BINARY
+            return bitstr.bytes, ABNF.OPCODE_BINARY
+        ws_payload = json_dumps(message.as_dict)
+        if bus.crypto_key:
+            ws_payload = encrypt_as_json(bus.crypto_key, ws_payload,
+                                         cipher=bus.cipher, encoding=bus.json_encoding)
+        return ws_payload, ABNF.OPCODE_TEXT
+
+    def _wait_connected(self, batch: List[OutboundItem]) -> List[OutboundItem]:
+        """Wait for the handshake with a batch taken before the connection dropped
+
+        items are only held as long as the OfflineQueue would hold them, returns the ones
+        still worth sending once connected
+        """
+        held = time.monotonic()
+        while not self.bus.handshake_event.is_set():
+            if self._closed:
+                error = ConnectionError("HiveMind connection is closed")
+                for item in batch:
+                    item.future.set_exception(error)
+                return []
+            waited = time.monotonic() - held
+            kept = []
+            for item in batch:
+                is_bus = item.message.msg_type == HiveMessageType.BUS
+                if is_bus and waited < command_policy(item.message["type"])[1]:
+                    kept.append(item)
+                else:
+                    item.future.set_exception(ConnectionError("HiveMind disconnected before the message was sent"))
+            if len(kept) < len(batch):
+                LOG.debug(f"HiveMind is disconnected, dropped {len(batch) - len(kept)} messages taken for sending")
+            batch = kept
+            if not batch:
+                return batch
+            self.bus.handshake_event.wait(CONNECT_POLL_INTERVAL)
+        return batch
+
+    def _frame(self, ws, item: OutboundItem) -> ABNF:
+        if item.message.msg_type == HiveMessageType.BUS:
+            # local handlers see outbound bus messages too, same as the library client,
+            # flagged on a copy of the context so the device never receives the flag
+            echo = item.message.payload
+            echo.context = {**echo.context, ECHO_CONTEXT: True}
+            self.bus.internal_bus.emit(echo)
+        ws_payload, opcode = self.encode(item.message, item.binary_type)
+        frame = ABNF.create_frame(ws_payload, opcode)
+        if ws.get_mask_key:
+            frame.get_mask_key = ws.get_mask_key
+        return frame
+
+    def _run(self):
+        while True:
+            batch = self._lanes.get_batch(MAX_BATCH)
+            if not batch:
+                break
+            batch = self._wait_connected([item for item in batch
+                                          if item.future.set_running_or_notify_cancel()])
+            if not batch:
+                continue
+            ws = self.bus.client.sock
+            frames, sent = [], []
+            size = 0
+            for item in batch:
+                try:
+                    profiler = self.bus.stats.profiler
+                    if profiler is not None:
+                        frame = profiler.runcall(self._frame, ws, item)
+                    else:
+                        frame = self._frame(ws, item)
+                except Exception as e:
+                    LOG.warning(f"Could not encode {item.message.msg_type} message for HiveMind: {e}")
+                    item.future.set_exception(e)
+                    continue
+                frames.append(frame)
+                sent.append(item)
+                size += len(frame.data)
+                if size >= MAX_BATCH_BYTES:
+                    self._write(ws, frames, sent)
+                    frames, sent, size = [], [], 0
+            if frames:
+                self._write(ws, frames, sent)
+
+    def _write(self, ws, frames: List[ABNF], items: List[OutboundItem]):
+        try:
+            if ws is None:
+                raise WebSocketConnectionClosedException("socket is already closed.")
+            if hasattr(ws, "_send") and hasattr(ws, "lock"):
+                # every message keeps its own websocket frame, queued frames share one write.
+                # Same loop as WebSocket.send_frame, under its lock so pings are not interleaved
+                data = memoryview(b"".join(frame.format() for frame in frames))
+                size = len(data)
+                with ws.lock:
+                    while data:
+                        data = data[ws._send(data):]
+            else:
+                # websocket-client without the private send loop, one write per frame
+                size = sum(ws.send_frame(frame) for frame in frames)
+        except Exception as e:
+            LOG.warning(f"Could not send {len(items)} messages to HiveMind: {e}")
+            for item in items:
+                item.future.set_exception(e)
+        else:
+            self.bus.stats.bytes_out += size
+            for item in items:
+                item.future.set_result(None)
@@ -0,0 +1,268 @@
+"""Queries refreshing the entities of a HiveMind device"""
+import asyncio
+import random
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from ovos_bus_client.message import Message
+from ovos_utils.ocp import PlayerState
+
+from .device_state import DEFAULTS
+
+POLL_INTERVAL = 30  # seconds between the polls of an entity of an idle device
+ACTIVE_POLL_INTERVAL = 10  # while media plays or the listener handles a command
+SLEEPING_POLL_INTERVAL = 120
+HEALTH_POLL_INTERVAL = 300  # services that reported they are alive or ready
+ACTIVE_LISTENER_STATES = ("recording", "in_cmd")
+POLL_JITTER = 0.1  # fraction of the interval every poll is moved by at random
+SNAPSHOT_SPREAD = 10  # seconds, every device starts polling at its own offset within
+SNAPSHOT_STEP = 0.2  # seconds between the queries of a snapshot
+MAX_OUTSTANDING_REQUESTS = 16  # unanswered queries of all devices together
+REQUEST_TIMEOUT = 5  # seconds a query counts as outstanding without an answer
+
+# query -> message answering it, for queries not answered by "<query>.response"
+RESPONSES = {
+    "recognizer_loop:state.get": "recognizer_loop:state",
+    "mycroft.audio.speak.status": "mycroft.audio.is_speaking",
+}
+
+
+def activity_interval(state) -> float:
+    """Poll interval for the activity of a device, from its DeviceState"""
+    if state["player_state"] == PlayerState.PLAYING or state["listener_state"] in ACTIVE_LISTENER_STATES:
+        return ACTIVE_POLL_INTERVAL
+    if state["sleeping"]:
+        return SLEEPING_POLL_INTERVAL
+    return POLL_INTERVAL
+
+
+def response_type(msg_type: str) -> str:
+    return RESPONSES.get(msg_type, f"{msg_type}.response")
+
+
+def _query_key(message: Message) -> Tuple[str, str]:
+    return message.msg_type, repr(message.data)
+
+
+class _Slot:
+    """A query holding one place in the RequestLimiter until answered or timed out"""
+    __slots__ = ("_limiter", "_handle", "done")
+
+    def __init__(self, limiter: "RequestLimiter"):
+        self._limiter = limiter
+        self._handle = limiter.hass.loop.call_later(limiter.timeout, self.release, True)
+        self.done = False
+
+    def release(self, timed_out: bool = False):
+        if self.done:
+            return
+        self.done = True
+        self._handle.cancel()
+        self._limiter._release(timed_out)
+
+
+class RequestLimiter:
+    """Bound the queries waiting for an answer, shared by all devices
+
+    a hub answering slowly delays further polls instead of receiving them all at once
+    """
+
+    def __init__(self, hass: HomeAssistant, limit: int = MAX_OUTSTANDING_REQUESTS,
+                 timeout: float = REQUEST_TIMEOUT):
+        self.hass = hass
+        self.limit = limit
+        self.timeout = timeout
+        self.outstanding = 0
+        self.delayed = 0  # queries that waited for a free place
+        self.timeouts = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> _Slot:
+        if self._semaphore.locked():
+            self.delayed += 1
+        await self._semaphore.acquire()
+        self.outstanding += 1
+        return _Slot(self)
+
+    def _release(self, timed_out: bool):
+        self.outstanding -= 1
+        if timed_out:
+            self.timeouts += 1
+        self._semaphore.release()
+
+    def as_dict(self) -> dict:
+        return {"limit": self.limit,
+                "outstanding": self.outstanding,
+                "delayed": self.delayed,
+                "timeouts": self.timeouts}
+
+
+class DevicePoller:
+    """Poll the entities of one device, replaces the Home Assistant scan intervals
+
+    after every handshake the queries of all entities are sent once as a snapshot, then each
+    entity is polled every ``poll_interval`` seconds moved by a random jitter. A query shared by
+    several entities is sent once per interval. Every device starts at its own offset so devices
+    connecting together, like every device at boot, do not poll in step.
+    Intervals follow the device activity, an entity is rescheduled when one of its fields
+    changes, pushed or not, or when its interval changes with the activity
+    """
+
+    def __init__(self, hass: HomeAssistant, bus, limiter: RequestLimiter):
+        self.hass = hass
+        self.bus = bus
+        self.limiter = limiter
+        self.offset = random.uniform(0, SNAPSHOT_SPREAD)
+        self.entities = []
+        self.snapshots = 0
+        self.requests = 0
+        self._task: Optional[asyncio.Task] = None
+        self._snapshot_done = False
+        self._due: Dict[object, float] = {}  # entity -> loop time of its next poll
+        self._intervals: Dict[object, float] = {}  # entity -> poll_interval it was scheduled with
+        self._wakeup = asyncio.Event()
+        self._sent: Dict[Tuple[str, str], float] = {}  # query -> loop time it was last sent
+        self._waiting: Dict[str, Deque[_Slot]] = defaultdict(deque)  # response type -> queries
+        bus.handshake_listeners.append(self.handle_handshake)
+        bus.bus_listeners.append(self.handle_message)
+        self._unsubscribe = bus.device_state.subscribe(DEFAULTS, self.handle_state_change)
+
+    def add(self, entity) -> Callable[[], None]:
+        """Poll an entity and include it in the snapshots, returns a remove callback"""
+        self.entities.append(entity)
+
+        def remove():
+            if entity in self.entities:
+                self.entities.remove(entity)
+            self._due.pop(entity, None)
+            self._intervals.pop(entity, None)
+        return remove
+
+    @property
+    def snapshot_pending(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._snapshot_done
+
+    def handle_handshake(self):
+        self.hass.loop.call_soon_threadsafe(self.async_start)
+
+    def handle_message(self, msg_type: str, message):
+        # called on the bus thread for every inbound message
+        if msg_type in self._waiting:
+            self.hass.loop.call_soon_threadsafe(self._async_answered, msg_type)
+
+    def handle_state_change(self, changed: Set[str]):
+        self.hass.loop.call_soon_threadsafe(self._async_reschedule, changed)
+
+    @callback
+    def _async_reschedule(self, changed: Set[str]):
+        if not self._snapshot_done:
+            return
+        for entity in self.entities:
+            if entity in self._due and (not changed.isdisjoint(entity.state_fields)
+                                        or entity.poll_interval != self._intervals.get(entity)):
+                self._schedule(entity)
+        self._wakeup.set()
+
+    @callback
+    def _async_answered(self, msg_type: str):
+        waiting = self._waiting.get(msg_type)
+        while waiting:
+            slot = waiting.popleft()
+            if not slot.done:
+                slot.release()
+                break
+        if not waiting:
+            self._waiting.pop(msg_type, None)
+
+    @callback
+    def async_start(self):
+        """Send a snapshot and poll from there on, restarts a running poller"""
+        if self._task is not None:
+            self._task.cancel()
+        self._snapshot_done = False
+        self._due.clear()
+        self._intervals.clear()
+        self._task = self.hass.async_create_background_task(
+            self._async_run(), f"hivemind poller {self.bus.site_id}")
+
+    def snapshot_messages(self) -> List[Message]:
+        messages: Dict[Tuple[str, str], Message] = {}
+        for entity in self.entities:
+            for message in entity.poll_messages():
+                messages.setdefault(_query_key(message), message)
+        return list(messages.values())
+
+    def _schedule(self, entity):
+        interval = self._intervals[entity] = entity.poll_interval
+        self._due[entity] = self.hass.loop.time() + interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+    async def _async_run(self):
+        loop = self.hass.loop
+        await asyncio.sleep(self.offset)
+        for idx, message in enumerate(self.snapshot_messages()):
+            if idx:
+                await asyncio.sleep(SNAPSHOT_STEP)
+            await self._async_send(message)
+        self.snapshots += 1
+        self._snapshot_done = True
+        while True:
+            for entity in list(self.entities):
+                if entity not in self._due:
+                    self._schedule(entity)
+                elif self._due[entity] <= loop.time():
+                    self._schedule(entity)
+                    await self._async_poll(entity)
+            next_poll = min(self._due.values(), default=loop.time() + POLL_INTERVAL)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(next_poll - loop.time(), 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _async_poll(self, entity):
+        for message in entity.poll_messages():
+            sent = self._sent.get(_query_key(message))
+            # already sent for another entity of the device during this interval
+            if sent is not None and self.hass.loop.time() - sent < entity.poll_interval / 2:
+                continue
+            await self._async_send(message)
+
+    async def _async_send(self, message: Message):
+        slot = await self.limiter.acquire()
+        if not self.bus.handshake_event.is_set():
+            slot.release()
+            return
+        waiting = self._waiting[response_type(message.msg_type)]
+        while waiting and waiting[0].done:
+            waiting.popleft()
+        waiting.append(slot)
+        self._sent[_query_key(message)] = self.hass.loop.time()
+        self.requests += 1
+        self.bus.emit_mycroft(message)
+
+    def shutdown(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for waiting in self._waiting.values():
+            for slot in waiting:
+                slot.release()
+        self._waiting.clear()
+        if self.handle_handshake in self.bus.handshake_listeners:
+            self.bus.handshake_listeners.remove(self.handle_handshake)
+        if self.handle_message in self.bus.bus_listeners:
+            self.bus.bus_listeners.remove(self.handle_message)
+        self._unsubscribe()
+        self.entities.clear()
+        self._due.clear()
+        self._intervals.clear()
+
+    def as_dict(self) -> dict:
+        return {"entities": len(self.entities),
+                "offset": round(self.offset, 2),
+                "snapshots": self.snapshots,
+                "snapshot_pending": self.snapshot_pending,
+                "requests": self.requests,
+                "waiting": sum(len(waiting) for waiting in self._waiting.values()),
+                "limiter": self.limiter.as_dict()}
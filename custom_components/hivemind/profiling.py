@@ -0,0 +1,108 @@
+"""On demand profiling of the HiveMind connection threads and bus handlers"""
+import cProfile
+import sys
+import threading
+from collections import Counter
+from typing import Callable, Dict, List
+
+PROFILE_SAMPLING = "sampling"
+PROFILE_DETERMINISTIC = "deterministic"
+PROFILE_MODES = (PROFILE_SAMPLING, PROFILE_DETERMINISTIC)
+DEFAULT_PROFILE_DURATION = 60  # seconds
+MAX_PROFILE_DURATION = 600
+DEFAULT_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+MAX_STACK_DEPTH = 64
+
+
+def bus_threads(bus) -> List[threading.Thread]:
+    """Threads owned by a connection, inbound messages and their handlers run on the first one"""
+    threads = [bus._thread, bus.sender._thread]
+    if bus.capture is not None:
+        threads.append(bus.capture._thread)
+    return [thread for thread in threads if thread is not None and thread.is_alive()]
+
+
+class BusProfiler:
+    """Profile a set of HiveMind connections until stopped
+
+    sampling mode records the stacks of the connection threads every ``interval`` seconds
+    and is written as collapsed stacks, one ``thread;outer;...;inner count`` line per stack,
+    for flamegraph.pl or speedscope.
+    deterministic mode runs bus handlers and outbound encoding under cProfile and is written
+    as a pstats file. cProfile can only trace one section at a time, so profiled sections
+    are serialized while it runs
+    """
+
+    def __init__(self, buses: list, mode: str = PROFILE_SAMPLING,
+                 interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.buses = buses
+        self.mode = mode
+        self.interval = interval
+        self.samples = 0
+        self._stacks = Counter()  # (thread name, code objects outermost first) -> samples
+        self._profile = cProfile.Profile()
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="hivemind-profiler", daemon=True)
+
+    def start(self):
+        if self.mode == PROFILE_SAMPLING:
+            self._thread.start()
+        else:
+            for bus in self.buses:
+                bus.stats.profiler = self
+
+    def stop(self):
+        self._stopped.set()
+        if self.mode == PROFILE_SAMPLING:
+            self._thread.join()
+        else:
+            for bus in self.buses:
+                if bus.stats.profiler is self:
+                    bus.stats.profiler = None
+            # wait for a section still running before the profile is read
+            with self._lock:
+                pass
+
+    def runcall(self, func: Callable, *args, **kwargs):
+        if self._stopped.is_set():
+            return func(*args, **kwargs)
+        with self._lock:
+            # nested handlers are already traced by the outermost section
+            self._depth += 1
+            try:
+                if self._depth > 1:
+                    return func(*args, **kwargs)
+                self.samples += 1
+                return self._profile.runcall(func, *args, **kwargs)
+            finally:
+                self._depth -= 1
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            threads: Dict[int, str] = {thread.ident: f"{bus.site_id}/{thread.name}"
+                                       for bus in self.buses for thread in bus_threads(bus)}
+            for ident, frame in sys._current_frames().items():
+                name = threads.get(ident)
+                if name is None:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                self._stacks[(name, tuple(reversed(stack)))] += 1
+            self.samples += 1
+
+    def dump(self, path: str) -> int:
+        """Write the profile collected so far, returns the samples or profiled calls it holds"""
+        if self.mode == PROFILE_DETERMINISTIC:
+            with self._lock:
+                self._profile.dump_stats(path)
+            return self.samples
+        with open(path, "w") as f:
+            for (name, stack), count in self._stacks.most_common():
+                frames = ";".join(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                                  for code in stack)
+                f.write(f"{name};{frames} {count}\n")
+        return self.samples
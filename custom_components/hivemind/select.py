@@ -2,46 +2,23 @@
 import logging
 from typing import List
 from ovos_bus_client.message import Message
-from hivemind_bus_client.client import HiveMessageBusClient
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.core import HomeAssistant, State
 
-from .const import DOMAIN
+from .entity import HiveMindEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class HiveMindListeningMode(SelectEntity):
+class HiveMindListeningMode(HiveMindEntity, SelectEntity):
     """control listening mode via ovos-dinkum-listener"""
-
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-        self._mode = "wakeword"
-
-        self.bus.on_mycroft("recognizer_loop:state", self.handle_loop_status)
+    state_fields = ("listening_mode",)
 
     @property
     def available(self) -> bool:
         return self.bus.handshake_event.is_set()
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -52,19 +29,18 @@ class HiveMindListeningMode(SelectEntity):
         """Return a unique ID for this entity."""
         return f"hm-listen-mode-{self._name}-{self.site_id}".replace(" ", "")
 
-    async def async_update(self):
-        self.bus.emit_mycroft(Message(f"recognizer_loop:state.get"))
+    def poll_messages(self) -> List[Message]:
+        return [Message("recognizer_loop:state.get")]
 
-    def handle_loop_status(self, message: Message):
-        mode = message.data.get("mode", "wakeword")
-        if mode != "sleeping":
-            self._mode = mode
-            self.schedule_update_ha_state()
+    def restored_fields(self, state: State) -> dict:
+        if state.state not in self.options:
+            return {}
+        return {"listening_mode": state.state}
 
     @property
     def current_option(self) -> str:
         """Return the current listener mode"""
-        return self._mode
+        return self.bus.device_state["listening_mode"]
 
     @property
     def options(self) -> List[str]:
@@ -78,9 +54,9 @@ class HiveMindListeningMode(SelectEntity):
 
     @property
     def icon(self) -> str | None:
-        if self._mode == "hybrid":
+        if self.current_option == "hybrid":
             return "mdi:microphone-plus"
-        elif self._mode == "continuous":
+        elif self.current_option == "continuous":
             return "mdi:microphone-settings"
         return "mdi:microphone-message"
 
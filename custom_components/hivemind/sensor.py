@@ -5,27 +5,17 @@ from ovos_bus_client.message import Message
 from hivemind_bus_client.client import HiveMessageBusClient
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, State
 
-from .const import DOMAIN
+from .entity import HiveMindEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class HiveMindListenerStateSensor(SensorEntity):
+class HiveMindListenerStateSensor(HiveMindEntity, SensorEntity):
     """Sensor for HiveMind listener state"""
-
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-        self._mode = "wakeword"
-
-        self.bus.on_mycroft("recognizer_loop:state", self.handle_loop_status)
-        self.bus.on_mycroft("recognizer_loop:sleep", self.handle_sleep_enabled)
-        self.bus.on_mycroft("recognizer_loop:awoken", self.handle_sleep_disabled)
+    state_fields = ("listener_state",)
 
     @property
     def name(self):
@@ -37,19 +27,6 @@ class HiveMindListenerStateSensor(SensorEntity):
         """Return a unique ID for this entity."""
         return f"hm-listen-state-{self._name}-{self.site_id}".replace(" ", "")
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def device_class(self) -> SensorDeviceClass:
         return SensorDeviceClass.ENUM
@@ -65,47 +42,149 @@ class HiveMindListenerStateSensor(SensorEntity):
                 "sleeping", "wake_up", "confirmation",
                 "before_cmd", "in_cmd", "after_cmd"]
 
-    async def async_update(self):
-        self.bus.emit_mycroft(Message(f"recognizer_loop:state.get"))
-
-    def handle_loop_status(self, message: Message):
-        self._mode = message.data.get("state", "wakeword")
-        self.schedule_update_ha_state()
-
-    def handle_sleep_enabled(self, message: Message):
-        self._mode = "sleeping"
-        self.schedule_update_ha_state()
+    def poll_messages(self) -> List[Message]:
+        return [Message("recognizer_loop:state.get")]
 
-    def handle_sleep_disabled(self, message: Message):
-        self._mode = "wake_up"
-        self.schedule_update_ha_state()
+    def restored_fields(self, state: State) -> dict:
+        if state.state not in self.options:
+            return {}
+        return {"listener_state": state.state}
 
     @property
     def native_value(self) -> str | None:
-        return self._mode
+        return self.bus.device_state["listener_state"]
 
     @property
     def icon(self) -> str | None:
-        if self._mode == "continuous":
+        mode = self.native_value
+        if mode == "continuous":
             return "mdi:microphone-settings"
-        elif self._mode == "sleeping":
+        elif mode == "sleeping":
             return "mdi:sleep"
-        elif self._mode == "wakeword":
+        elif mode == "wakeword":
             return "mdi:microphone-message"
-        elif self._mode == "recording":
+        elif mode == "recording":
             return "mdi:record-rec"
-        elif self._mode == "before_cmd":
+        elif mode == "before_cmd":
             return "mdi:chat-sleep"
-        elif self._mode == "in_cmd":
+        elif mode == "in_cmd":
             return "mdi:chat-processing"
-        elif self._mode == "after_cmd":
+        elif mode == "after_cmd":
             return "mdi:chat"
-        elif self._mode == "wake_up":
+        elif mode == "wake_up":
             return "mdi:chat-alert"
-        # elif self._mode == "confirmation"
+        # elif mode == "confirmation"
         return "mdi:music-box"
 
 
+
+class HiveMindCommandLatencySensor(HiveMindEntity, SensorEntity):
+    """Mean time for the device to confirm a command, details per command in the attributes"""
+
+    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
+        """Initialize the service."""
+        super().__init__(bus, site_id, name, **kwargs)
+        self.bus.latency.listeners.append(self.handle_latency_update)
+
+    @property
+    def name(self):
+        """Name of the entity."""
+        return f"Command Latency ({self._name})"
+
+    @property
+    def unique_id(self) -> str | None:
+        """Return a unique ID for this entity."""
+        return f"hm-command-latency-{self._name}-{self.site_id}".replace(" ", "")
+
+    @property
+    def device_class(self) -> SensorDeviceClass:
+        return SensorDeviceClass.DURATION
+
+    @property
+    def state_class(self) -> SensorStateClass:
+        return SensorStateClass.MEASUREMENT
+
+    @property
+    def entity_category(self) -> EntityCategory:
+        return EntityCategory.DIAGNOSTIC
+
+    @property
+    def native_unit_of_measurement(self) -> str:
+        return UnitOfTime.MILLISECONDS
+
+    @property
+    def should_poll(self) -> bool:
+        # updated by the latency listeners, expiry runs on its own schedule
+        return False
+
+    def handle_latency_update(self):
+        if self.hass is not None:
+            self.schedule_update_ha_state()
+
+    @property
+    def native_value(self) -> float | None:
+        histograms = list(self.bus.latency.latency.values())
+        count = sum(h.count for h in histograms)
+        if not count:
+            return None
+        return round(sum(h.sum for h in histograms) * 1000 / count, 1)
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return self.bus.latency.as_dict()
+
+    @property
+    def icon(self) -> str | None:
+        return "mdi:timer-sand"
+
+
+class HiveMindCommandFailuresSensor(HiveMindEntity, SensorEntity):
+    """Commands the device did not confirm in time, per command in the attributes"""
+
+    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
+        """Initialize the service."""
+        super().__init__(bus, site_id, name, **kwargs)
+        self.bus.latency.listeners.append(self.handle_latency_update)
+
+    @property
+    def name(self):
+        """Name of the entity."""
+        return f"Command Failures ({self._name})"
+
+    @property
+    def unique_id(self) -> str | None:
+        """Return a unique ID for this entity."""
+        return f"hm-command-failures-{self._name}-{self.site_id}".replace(" ", "")
+
+    @property
+    def state_class(self) -> SensorStateClass:
+        return SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def entity_category(self) -> EntityCategory:
+        return EntityCategory.DIAGNOSTIC
+
+    @property
+    def should_poll(self) -> bool:
+        return False
+
+    def handle_latency_update(self):
+        if self.hass is not None:
+            self.schedule_update_ha_state()
+
+    @property
+    def native_value(self) -> int:
+        return sum(dict(self.bus.latency.failures).values())
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return dict(self.bus.latency.failures)
+
+    @property
+    def icon(self) -> str | None:
+        return "mdi:timer-alert"
+
+
 async def async_setup_entry(
         hass: HomeAssistant,
         entry: ConfigEntry,
@@ -123,5 +202,16 @@ async def async_setup_entry(
         site_id=site_id
     )
 
+    latency_sensor = HiveMindCommandLatencySensor(
+        bus=entry.hm_bus,
+        name=name,
+        site_id=site_id
+    )
+    failures_sensor = HiveMindCommandFailuresSensor(
+        bus=entry.hm_bus,
+        name=name,
+        site_id=site_id
+    )
+
     # Add it to Home Assistant
-    async_add_entities([listener_sensor])
+    async_add_entities([listener_sensor, latency_sensor, failures_sensor])
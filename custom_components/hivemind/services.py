@@ -0,0 +1,233 @@
+"""HiveMind integration services"""
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Future
+from typing import Dict, List
+
+import voluptuous as vol
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_call_later
+from ovos_bus_client.message import Message
+
+from .capture import replay_capture
+from .client import HiveMindClient
+from .codec import json_dumps
+from .const import DOMAIN
+from .profiling import (BusProfiler, PROFILE_MODES, PROFILE_SAMPLING, PROFILE_DETERMINISTIC,
+                        DEFAULT_PROFILE_DURATION, MAX_PROFILE_DURATION, DEFAULT_SAMPLE_INTERVAL)
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_REPLAY_CAPTURE = "replay_capture"
+SERVICE_SEND_MESSAGES = "send_messages"
+SERVICE_SET_TRACING = "set_tracing"
+SERVICE_DUMP_TRACE = "dump_trace"
+SERVICE_START_PROFILING = "start_profiling"
+SERVICE_STOP_PROFILING = "stop_profiling"
+
+ATTR_FILENAME = "filename"
+ATTR_SPEED = "speed"
+ATTR_MESSAGES = "messages"
+ATTR_TIMEOUT = "timeout"
+ATTR_ENABLED = "enabled"
+ATTR_BUFFER_SIZE = "buffer_size"
+ATTR_SAMPLE_RATE = "sample_rate"
+ATTR_SAMPLE_RATES = "sample_rates"
+ATTR_MODE = "mode"
+ATTR_DURATION = "duration"
+ATTR_INTERVAL = "interval"
+
+DEVICES_SCHEMA = vol.Schema({
+    vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string])
+})
+START_CAPTURE_SCHEMA = DEVICES_SCHEMA.extend({
+    vol.Optional(ATTR_FILENAME): cv.string
+})
+SAMPLE_RATE = vol.All(vol.Coerce(float), vol.Range(min=0, max=1))
+SET_TRACING_SCHEMA = DEVICES_SCHEMA.extend({
+    vol.Required(ATTR_ENABLED): cv.boolean,
+    vol.Optional(ATTR_BUFFER_SIZE): vol.All(vol.Coerce(int), vol.Range(min=1, max=10000)),
+    vol.Optional(ATTR_SAMPLE_RATE): SAMPLE_RATE,
+    vol.Optional(ATTR_SAMPLE_RATES): {cv.string: SAMPLE_RATE}
+})
+START_PROFILING_SCHEMA = START_CAPTURE_SCHEMA.extend({
+    vol.Optional(ATTR_MODE, default=PROFILE_SAMPLING): vol.In(PROFILE_MODES),
+    vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION):
+        vol.All(vol.Coerce(float), vol.Range(min=1, max=MAX_PROFILE_DURATION)),
+    vol.Optional(ATTR_INTERVAL, default=DEFAULT_SAMPLE_INTERVAL):
+        vol.All(vol.Coerce(float), vol.Range(min=0.001, max=1))
+})
+REPLAY_CAPTURE_SCHEMA = DEVICES_SCHEMA.extend({
+    vol.Required(ATTR_FILENAME): cv.string,
+    vol.Optional(ATTR_SPEED, default=1.0): vol.All(vol.Coerce(float), vol.Range(min=0))
+})
+
+
+def _json_serializable(value):
+    try:
+        json_dumps(value)
+    except (TypeError, ValueError) as e:
+        raise vol.Invalid(f"not JSON serializable: {e}")
+    return value
+
+
+MESSAGE_SCHEMA = vol.Schema({
+    vol.Required("type"): cv.string,
+    vol.Optional("data", default=dict): vol.All(dict, _json_serializable),
+    vol.Optional("context", default=dict): vol.All(dict, _json_serializable)
+})
+SEND_MESSAGES_SCHEMA = DEVICES_SCHEMA.extend({
+    vol.Required(ATTR_MESSAGES): vol.All(cv.ensure_list, vol.Length(min=1), [MESSAGE_SCHEMA]),
+    vol.Optional(ATTR_TIMEOUT, default=10): vol.All(vol.Coerce(float), vol.Range(min=0.1))
+})
+
+
+def get_device_buses(hass: HomeAssistant, device_ids) -> Dict[str, HiveMindClient]:
+    """Map HiveMind device ids to the connection of their config entry"""
+    registry = dr.async_get(hass)
+    entries = hass.data.get(DOMAIN, {})
+    buses = {}
+    for device_id in device_ids:
+        device = registry.async_get(device_id)
+        if device is None:
+            raise HomeAssistantError(f"Unknown device: {device_id}")
+        for entry_id in device.config_entries:
+            if entry_id in entries:
+                buses[device_id] = entries[entry_id].hm_bus
+                break
+        else:
+            raise HomeAssistantError(f"Device {device_id} is not a loaded HiveMind device")
+    return buses
+
+
+def _data_path(hass: HomeAssistant, filename: str) -> str:
+    # only the file name is used so files always live under <config>/hivemind
+    return hass.config.path(DOMAIN, os.path.basename(filename))
+
+
+def _send_messages(bus: HiveMindClient, messages: List[dict]) -> List[Future]:
+    # the validated data is shared by every target, but the bytes can not be: each connection
+    # injects its own routing context and encrypts with its own session key and cipher,
+    # so every message is serialized once per connection, on its sender thread
+    return [bus.emit(Message(msg["type"], msg["data"], msg["context"])) for msg in messages]
+
+
+async def async_setup_services(hass: HomeAssistant):
+    """Register the HiveMind services"""
+
+    async def start_capture(call: ServiceCall):
+        buses = get_device_buses(hass, call.data[ATTR_DEVICE_ID])
+        await hass.async_add_executor_job(os.makedirs, hass.config.path(DOMAIN), 0o755, True)
+        for device_id, bus in buses.items():
+            filename = call.data.get(ATTR_FILENAME)
+            if not filename or len(buses) > 1:
+                filename = f"capture-{device_id}-{int(time.time())}.jsonl"
+            path = _data_path(hass, filename)
+            await hass.async_add_executor_job(bus.start_capture, path)
+
+    async def stop_capture(call: ServiceCall):
+        for bus in get_device_buses(hass, call.data[ATTR_DEVICE_ID]).values():
+            await hass.async_add_executor_job(bus.stop_capture)
+
+    async def replay(call: ServiceCall):
+        path = _data_path(hass, call.data[ATTR_FILENAME])
+        if not await hass.async_add_executor_job(os.path.isfile, path):
+            raise HomeAssistantError(f"Capture file not found: {path}")
+        for bus in get_device_buses(hass, call.data[ATTR_DEVICE_ID]).values():
+            count = await hass.async_add_executor_job(replay_capture, path, bus,
+                                                      call.data[ATTR_SPEED])
+            _LOGGER.info(f"Replayed {count} messages from {path}")
+
+    async def set_tracing(call: ServiceCall):
+        for bus in get_device_buses(hass, call.data[ATTR_DEVICE_ID]).values():
+            bus.tracer.configure(call.data[ATTR_ENABLED],
+                                 size=call.data.get(ATTR_BUFFER_SIZE),
+                                 sample_rate=call.data.get(ATTR_SAMPLE_RATE),
+                                 sample_rates=call.data.get(ATTR_SAMPLE_RATES))
+
+    async def dump_trace(call: ServiceCall):
+        buses = get_device_buses(hass, call.data[ATTR_DEVICE_ID])
+        await hass.async_add_executor_job(os.makedirs, hass.config.path(DOMAIN), 0o755, True)
+        for device_id, bus in buses.items():
+            filename = call.data.get(ATTR_FILENAME)
+            if not filename or len(buses) > 1:
+                filename = f"trace-{device_id}-{int(time.time())}.jsonl"
+            path = _data_path(hass, filename)
+            count = await hass.async_add_executor_job(bus.tracer.dump, path)
+            _LOGGER.info(f"Wrote {count} traced messages to {path}")
+
+    # one profile at a time for the whole integration, cProfile can not run twice
+    profiling = {}
+
+    async def finish_profiling(*_):
+        if not profiling:
+            return
+        profiler, path, cancel = profiling.pop("profiler"), profiling.pop("path"), profiling.pop("cancel")
+        cancel()
+        await hass.async_add_executor_job(profiler.stop)
+        count = await hass.async_add_executor_job(profiler.dump, path)
+        _LOGGER.info(f"Wrote HiveMind {profiler.mode} profile of {count} samples to {path}")
+
+    async def start_profiling(call: ServiceCall):
+        if profiling:
+            raise HomeAssistantError(f"A HiveMind profile is already being written to {profiling['path']}")
+        buses = get_device_buses(hass, call.data[ATTR_DEVICE_ID])
+        mode = call.data[ATTR_MODE]
+        filename = call.data.get(ATTR_FILENAME)
+        if not filename:
+            extension = "prof" if mode == PROFILE_DETERMINISTIC else "txt"
+            filename = f"profile-{int(time.time())}.{extension}"
+        await hass.async_add_executor_job(os.makedirs, hass.config.path(DOMAIN), 0o755, True)
+        profiler = BusProfiler(list(buses.values()), mode, call.data[ATTR_INTERVAL])
+        profiler.start()
+        profiling.update(profiler=profiler, path=_data_path(hass, filename),
+                         cancel=async_call_later(hass, call.data[ATTR_DURATION], finish_profiling))
+
+    async def send_messages(call: ServiceCall) -> ServiceResponse:
+        buses = get_device_buses(hass, call.data[ATTR_DEVICE_ID])
+        messages = call.data[ATTR_MESSAGES]
+        timeout = call.data[ATTR_TIMEOUT]
+
+        async def send(bus: HiveMindClient) -> dict:
+            if not bus.handshake_event.is_set():
+                return {"success": False, "error": "not connected"}
+            sent = asyncio.gather(*(asyncio.wrap_future(future) for future in _send_messages(bus, messages)),
+                                  return_exceptions=True)
+            try:
+                # a timeout is only reported, messages already queued are still sent
+                results = await asyncio.wait_for(asyncio.shield(sent), timeout)
+            except asyncio.TimeoutError:
+                return {"success": False, "error": "timeout"}
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                return {"success": False, "sent": len(messages) - len(errors),
+                        "error": str(errors[0]) or type(errors[0]).__name__}
+            return {"success": True, "sent": len(messages)}
+
+        results = await asyncio.gather(*(send(bus) for bus in buses.values()))
+        return dict(zip(buses, results))
+
+    hass.services.async_register(DOMAIN, SERVICE_START_CAPTURE, start_capture,
+                                 schema=START_CAPTURE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_CAPTURE, stop_capture,
+                                 schema=DEVICES_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_REPLAY_CAPTURE, replay,
+                                 schema=REPLAY_CAPTURE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_SET_TRACING, set_tracing,
+                                 schema=SET_TRACING_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_DUMP_TRACE, dump_trace,
+                                 schema=START_CAPTURE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_START_PROFILING, start_profiling,
+                                 schema=START_PROFILING_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_STOP_PROFILING, finish_profiling)
+    hass.services.async_register(DOMAIN, SERVICE_SEND_MESSAGES, send_messages,
+                                 schema=SEND_MESSAGES_SCHEMA,
+                                 supports_response=SupportsResponse.OPTIONAL)
@@ -0,0 +1,115 @@
+"""Opt-in detection of slow bus handlers and entity commands"""
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from collections import deque
+from typing import Callable, Dict
+
+from .stats import Histogram
+
+_LOGGER = logging.getLogger(__name__)
+
+# synchronous entity commands and bus writes, other plain methods are cheap helpers like
+# poll_messages that Home Assistant and the poller call on every tick
+SYNC_COMMANDS = ("press", "send_message", "send_to_ovos")
+ENTITY_LIFECYCLE = ("async_added_to_hass", "async_will_remove_from_hass")
+
+
+class StallDetector:
+    """Per name duration histograms, with a warning for every call over the threshold
+
+    bus handlers are timed by BusStats, entity commands by ``instrument``.
+    For coroutines the recorded duration is the longest step that held the event loop,
+    time spent awaiting is not a stall
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.histograms: Dict[str, Histogram] = {}
+        self.stalls = 0
+        self.recent = deque(maxlen=20)  # (timestamp, name, seconds)
+
+    def record(self, name: str, duration: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(duration)
+        if duration > self.threshold:
+            self.stalls += 1
+            self.recent.append((time.time(), name, duration))
+            _LOGGER.warning("HiveMind %s blocked for %.3f seconds", name, duration)
+
+    def instrument(self, entity):
+        """Time the commands and updates defined by the HiveMind entity classes of ``entity``"""
+        from .entity import HiveMindEntity
+
+        wrapped = set()
+        for cls in type(entity).__mro__:
+            if cls is HiveMindEntity or not issubclass(cls, HiveMindEntity):
+                continue
+            for name, func in vars(cls).items():
+                # bus handlers are already timed when registered
+                if name in wrapped or not _is_command(name, func):
+                    continue
+                wrapped.add(name)
+                setattr(entity, name, self._wrap(entity, name, getattr(entity, name)))
+
+    def _wrap(self, entity, name: str, method: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def timed_command(*args, **kwargs):
+                return await _TimedCoroutine(method(*args, **kwargs),
+                                             lambda blocked: self.record(f"command:{entity.entity_id}.{name}", blocked))
+            return timed_command
+
+        @functools.wraps(method)
+        def timed_command(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(f"command:{entity.entity_id}.{name}", time.perf_counter() - start)
+        return timed_command
+
+    def as_dict(self) -> dict:
+        return {"threshold": self.threshold,
+                "stalls": self.stalls,
+                "recent": [{"time": ts, "name": name, "seconds": round(duration, 4)}
+                           for ts, name, duration in list(self.recent)],
+                "histograms": {name: h.as_dict() for name, h in dict(self.histograms).items()}}
+
+
+def _is_command(name: str, func) -> bool:
+    if inspect.iscoroutinefunction(func):
+        return name.startswith("async_") and name not in ENTITY_LIFECYCLE
+    return name in SYNC_COMMANDS and inspect.isfunction(func)
+
+
+class _TimedCoroutine:
+    """Drive a coroutine like ``await`` does, reporting the longest uninterrupted step"""
+
+    def __init__(self, coro, report: Callable[[float], None]):
+        self._coro = coro
+        self._report = report
+
+    def __await__(self):
+        coro, blocked = self._coro, 0.0
+        value, error = None, None
+        while True:
+            start = time.perf_counter()
+            try:
+                yielded = coro.send(value) if error is None else coro.throw(error)
+            except StopIteration as e:
+                self._report(max(blocked, time.perf_counter() - start))
+                return e.value
+            except BaseException:
+                self._report(max(blocked, time.perf_counter() - start))
+                raise
+            blocked = max(blocked, time.perf_counter() - start)
+            value, error = None, None
+            try:
+                value = yield yielded
+            except BaseException as e:
+                error = e
@@ -0,0 +1,141 @@
+"""Runtime statistics of a HiveMind connection"""
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+from typing import Callable, Optional
+
+HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)  # seconds
+
+
+class Histogram:
+    """Fixed bucket histogram, observing a value never allocates"""
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(HISTOGRAM_BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self) -> list:
+        """(upper bound, observations <= bound) pairs, ending with +Inf"""
+        total, buckets = 0, []
+        for bound, count in zip(HISTOGRAM_BUCKETS + (float("inf"),), list(self.counts)):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+    def as_dict(self) -> dict:
+        return {"count": self.count,
+                "sum": round(self.sum, 6),
+                "max": round(self.max, 6),
+                "buckets": {str(bound): count for bound, count in self.cumulative()}}
+
+
+class BusStats:
+    """Cheap in-memory counters updated on the hot path of a HiveMind connection
+
+    counters are plain dicts and lists mutated from the bus thread,
+    readers only take shallow copies so the hot path never waits on a lock
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.connection_events = deque(maxlen=50)  # (timestamp, event)
+        self.reconnects = 0
+        self.handshake_durations = deque(maxlen=20)
+        self._handshake_started: Optional[float] = None
+        self.messages_in = defaultdict(int)
+        self.messages_out = defaultdict(int)
+        self.bytes_in = 0  # websocket payloads, as received and as written
+        self.bytes_out = 0
+        self.handler_time = {}  # msg_type -> Histogram of handler seconds
+        self.pending_requests = {}  # msg_type -> monotonic time sent
+        self.request_rtt = {}  # msg_type -> Histogram of response seconds
+        self.state_writes = defaultdict(int)
+        self.stalls = None  # StallDetector when stall detection is enabled
+        self.profiler = None  # BusProfiler while a deterministic profile is recorded
+
+    def record_connection_event(self, event: str):
+        self.connection_events.append((time.time(), event))
+        if event == "reconnecting":
+            self.reconnects += 1
+        elif event == "open":
+            self._handshake_started = time.monotonic()
+
+    def record_handshake(self):
+        self.connection_events.append((time.time(), "handshake"))
+        if self._handshake_started is not None:
+            self.handshake_durations.append(time.monotonic() - self._handshake_started)
+            self._handshake_started = None
+
+    def record_in(self, msg_type: str):
+        self.messages_in[msg_type] += 1
+        if msg_type.endswith(".response"):
+            sent = self.pending_requests.pop(msg_type[:-9], None)
+            if sent is not None:
+                _accumulate(self.request_rtt, msg_type[:-9], time.monotonic() - sent)
+
+    def record_out(self, msg_type: str, expects_response: bool = False):
+        self.messages_out[msg_type] += 1
+        if expects_response:
+            self.pending_requests[msg_type] = time.monotonic()
+
+    def record_write(self, entity_id: Optional[str]):
+        self.state_writes[entity_id] += 1
+
+    def wrap_handler(self, msg_type: str, func: Callable) -> Callable:
+        """Wrap a bus handler so its execution time is accounted to msg_type"""
+
+        def timed_handler(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                if self.profiler is not None:
+                    return self.profiler.runcall(func, *args, **kwargs)
+                return func(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                _accumulate(self.handler_time, msg_type, duration)
+                if self.stalls is not None:
+                    self.stalls.record(f"handler:{msg_type}", duration)
+
+        return timed_handler
+
+    def as_dict(self) -> dict:
+        uptime = max(time.time() - self.started, 1)
+        now = time.monotonic()
+        return {
+            "uptime": round(uptime, 1),
+            "reconnects": self.reconnects,
+            "connection_events": [{"time": ts, "event": ev} for ts, ev in list(self.connection_events)],
+            "handshake_durations": [round(d, 4) for d in list(self.handshake_durations)],
+            "messages_in": dict(self.messages_in),
+            "messages_out": dict(self.messages_out),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "handler_time": _timings(self.handler_time),
+            "request_rtt": _timings(self.request_rtt),
+            "pending_requests": {k: round(now - v, 3) for k, v in dict(self.pending_requests).items()},
+            "state_writes": {entity_id: {"total": count, "per_minute": round(count * 60 / uptime, 2)}
+                             for entity_id, count in dict(self.state_writes).items()}
+        }
+
+
+def _accumulate(timings: dict, key: str, duration: float):
+    histogram = timings.get(key)
+    if histogram is None:
+        histogram = timings[key] = Histogram()
+    histogram.observe(duration)
+
+
+def _timings(timings: dict) -> dict:
+    return {k: {"count": h.count, "total": round(h.sum, 6), "mean": round(h.sum / h.count, 6),
+                "max": round(h.max, 6)}
+            for k, h in dict(timings).items()}
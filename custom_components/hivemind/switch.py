@@ -1,30 +1,21 @@
 """HiveMind notification platform."""
 import logging
+from typing import List
+
 from ovos_bus_client.message import Message
-from hivemind_bus_client.client import HiveMessageBusClient
 from homeassistant.components.switch import SwitchEntity, SwitchDeviceClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.const import STATE_ON
+from homeassistant.core import HomeAssistant, State
 
-from .const import DOMAIN
+from .entity import HiveMindEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class HiveMindSSHSwitch(SwitchEntity):
+class HiveMindSSHSwitch(HiveMindEntity, SwitchEntity):
     """control SSH via ovos-PHAL-plugin-system"""
-
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-        self._enabled = False
-
-        self.bus.on_mycroft("system.ssh.status.response", self.handle_ssh_status)
-        self.bus.on_mycroft("system.ssh.enabled", self.handle_ssh_enabled)
-        self.bus.on_mycroft("system.ssh.disabled", self.handle_ssh_disabled)
+    state_fields = ("ssh",)
 
     @property
     def available(self) -> bool:
@@ -33,19 +24,6 @@ class HiveMindSSHSwitch(SwitchEntity):
     def device_class(self) -> SwitchDeviceClass | None:
         return SwitchDeviceClass.SWITCH
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -56,25 +34,16 @@ class HiveMindSSHSwitch(SwitchEntity):
         """Return a unique ID for this entity."""
         return f"hm-ssh-switch-{self._name}-{self.site_id}".replace(" ", "")
 
-    async def async_update(self):
-        self.bus.emit_mycroft(Message(f"system.ssh.status"))
-
-    def handle_ssh_status(self, message: Message):
-        self._enabled = message.data.get("enabled", False)
-        self.schedule_update_ha_state()
+    def poll_messages(self) -> List[Message]:
+        return [Message("system.ssh.status")]
 
-    def handle_ssh_enabled(self, message: Message):
-        self._enabled = True
-        self.schedule_update_ha_state()
-
-    def handle_ssh_disabled(self, message: Message):
-        self._enabled = False
-        self.schedule_update_ha_state()
+    def restored_fields(self, state: State) -> dict:
+        return {"ssh": state.state == STATE_ON}
 
     @property
     def is_on(self) -> bool:
         """Return the status of the switch"""
-        return self._enabled
+        return self.bus.device_state["ssh"]
 
     async def async_turn_on(self, **kwargs):
         """Turn the entity on."""
@@ -89,19 +58,9 @@ class HiveMindSSHSwitch(SwitchEntity):
         return "mdi:remote-desktop"
 
 
-class HiveMindVolumeMuteSwitch(SwitchEntity):
+class HiveMindVolumeMuteSwitch(HiveMindEntity, SwitchEntity):
     """control volume mute via ovos-PHAL-plugin-alsa"""
-
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-        self._muted = False
-
-        self.bus.on_mycroft("mycroft.volume.get.response", self.handle_mute_status)
-        self.bus.on_mycroft("mycroft.volume.mute", self.handle_mute_enabled)
-        self.bus.on_mycroft("mycroft.volume.unmute", self.handle_mute_disabled)
+    state_fields = ("muted",)
 
     @property
     def available(self) -> bool:
@@ -110,19 +69,6 @@ class HiveMindVolumeMuteSwitch(SwitchEntity):
     def device_class(self) -> SwitchDeviceClass | None:
         return SwitchDeviceClass.SWITCH
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -133,25 +79,16 @@ class HiveMindVolumeMuteSwitch(SwitchEntity):
         """Return a unique ID for this entity."""
         return f"hm-volume-mute-switch-{self._name}-{self.site_id}".replace(" ", "")
 
-    async def async_update(self):
-        self.bus.emit_mycroft(Message(f"mycroft.volume.get"))
-
-    def handle_mute_status(self, message: Message):
-        self._muted = message.data.get("muted", False)
-        self.schedule_update_ha_state()
+    def poll_messages(self) -> List[Message]:
+        return [Message("mycroft.volume.get")]
 
-    def handle_mute_enabled(self, message: Message):
-        self._muted = True
-        self.schedule_update_ha_state()
-
-    def handle_mute_disabled(self, message: Message):
-        self._muted = False
-        self.schedule_update_ha_state()
+    def restored_fields(self, state: State) -> dict:
+        return {"muted": state.state == STATE_ON}
 
     @property
     def is_on(self) -> bool:
         """Return the status of the switch"""
-        return self._muted
+        return self.bus.device_state["muted"]
 
     async def async_turn_on(self, **kwargs):
         """Turn the entity on."""
@@ -163,22 +100,14 @@ class HiveMindVolumeMuteSwitch(SwitchEntity):
 
     @property
     def icon(self) -> str | None:
-        if self._muted:
+        if self.is_on:
             return "mdi:volume-mute"
         return "mdi:volume-high"
 
 
-class HiveMindMicMuteSwitch(SwitchEntity):
+class HiveMindMicMuteSwitch(HiveMindEntity, SwitchEntity):
     """control microphone mute via ovos-dinkum-listener"""
-
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-        self._muted = False
-
-        self.bus.on_mycroft("mycroft.mic.get_status.response", self.handle_mute_status)
+    state_fields = ("mic_muted",)
 
     @property
     def available(self) -> bool:
@@ -187,19 +116,6 @@ class HiveMindMicMuteSwitch(SwitchEntity):
     def device_class(self) -> SwitchDeviceClass | None:
         return SwitchDeviceClass.SWITCH
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -210,17 +126,16 @@ class HiveMindMicMuteSwitch(SwitchEntity):
         """Return a unique ID for this entity."""
         return f"hm-mic-mute-switch-{self._name}-{self.site_id}".replace(" ", "")
 
-    async def async_update(self):
-        self.bus.emit_mycroft(Message(f"mycroft.mic.get_status"))
+    def poll_messages(self) -> List[Message]:
+        return [Message("mycroft.mic.get_status")]
 
-    def handle_mute_status(self, message: Message):
-        self._muted = message.data.get("muted", False)
-        self.schedule_update_ha_state()
+    def restored_fields(self, state: State) -> dict:
+        return {"mic_muted": state.state == STATE_ON}
 
     @property
     def is_on(self) -> bool:
         """Return the status of the switch"""
-        return self._muted
+        return self.bus.device_state["mic_muted"]
 
     async def async_turn_on(self, **kwargs):
         """Turn the entity on."""
@@ -232,24 +147,14 @@ class HiveMindMicMuteSwitch(SwitchEntity):
 
     @property
     def icon(self) -> str | None:
-        if self._muted:
+        if self.is_on:
             return "mdi:microphone-off"
         return "mdi:microphone"
 
 
-class HiveMindSleepModeSwitch(SwitchEntity):
+class HiveMindSleepModeSwitch(HiveMindEntity, SwitchEntity):
     """control sleep mode via ovos-dinkum-listener"""
-
-    def __init__(self, bus: HiveMessageBusClient, site_id: str, name: str, **kwargs) -> None:
-        """Initialize the service."""
-        self._name = name.replace(" ", "-")
-        self.site_id = site_id
-        self.bus = bus
-        self._sleeping = False
-
-        self.bus.on_mycroft("recognizer_loop:state", self.handle_sleep_status)
-        self.bus.on_mycroft("recognizer_loop:sleep", self.handle_sleep_enabled)
-        self.bus.on_mycroft("recognizer_loop:awoken", self.handle_sleep_disabled)
+    state_fields = ("sleeping",)
 
     @property
     def available(self) -> bool:
@@ -258,19 +163,6 @@ class HiveMindSleepModeSwitch(SwitchEntity):
     def device_class(self) -> SwitchDeviceClass | None:
         return SwitchDeviceClass.SWITCH
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, f"{self._name}-{self.site_id}-{self.bus._host}")
-            },
-            name=self._name,
-            manufacturer="JarbasAI",
-            model="HiveMindBus"
-        )
-
     @property
     def name(self):
         """Name of the entity."""
@@ -281,39 +173,30 @@ class HiveMindSleepModeSwitch(SwitchEntity):
         """Return a unique ID for this entity."""
         return f"hm-sleep-switch-{self._name}-{self.site_id}".replace(" ", "")
 
-    async def async_update(self):
-        self.bus.emit_mycroft(Message(f"recognizer_loop:state.get"))
-
-    def handle_sleep_status(self, message: Message):
-        self._sleeping = message.data.get("state", "wakeword") == "sleeping"
-        self.schedule_update_ha_state()
-
-    def handle_sleep_enabled(self, message: Message):
-        self._sleeping = True
-        self.schedule_update_ha_state()
+    def poll_messages(self) -> List[Message]:
+        return [Message("recognizer_loop:state.get")]
 
-    def handle_sleep_disabled(self, message: Message):
-        self._sleeping = False
-        self.schedule_update_ha_state()
+    def restored_fields(self, state: State) -> dict:
+        return {"sleeping": state.state == STATE_ON}
 
     @property
     def is_on(self) -> bool:
         """Return the status of the switch"""
-        return self._sleeping
+        return self.bus.device_state["sleeping"]
 
     async def async_turn_on(self, **kwargs):
         """Turn the entity on."""
-        self._sleeping = True
         self.bus.emit_mycroft(Message("recognizer_loop:sleep"))
+        self.bus.device_state.set_optimistic(sleeping=True)
 
     async def async_turn_off(self, **kwargs):
         """Turn the entity off."""
-        self._sleeping = False
         self.bus.emit_mycroft(Message("recognizer_loop:wake_up"))
+        self.bus.device_state.set_optimistic(sleeping=False)
 
     @property
     def icon(self) -> str | None:
-        if self._sleeping:
+        if self.is_on:
             return "mdi:sleep"
         return "mdi:sleep-off"
 
@@ -0,0 +1,114 @@
+"""Sampled in-memory tracing of HiveMind bus traffic"""
+import itertools
+import logging
+import random
+import reprlib
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from hivemind_bus_client.message import HiveMessage, HiveMessageType
+
+from .codec import json_dumps
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TRACE_SIZE = 200
+
+TRACE_DATA_KEYS = 32  # data keys copied per traced message
+
+# bounds of the data repr written for each traced message
+_SNAPSHOT = reprlib.Repr()
+_SNAPSHOT.maxstring = 80
+_SNAPSHOT.maxother = 80
+_SNAPSHOT.maxlist = _SNAPSHOT.maxtuple = _SNAPSHOT.maxdict = 8
+_SNAPSHOT.maxlevel = 3
+
+
+def _shallow_copy(data) -> dict:
+    if not isinstance(data, dict):
+        return {"type": type(data).__name__}
+    if len(data) <= TRACE_DATA_KEYS:
+        return dict(data)
+    return dict(itertools.islice(data.items(), TRACE_DATA_KEYS))
+
+
+def message_summary(message: HiveMessage) -> dict:
+    """Cheap snapshot of a message, binary payloads are reduced to their size"""
+    if message.msg_type == HiveMessageType.BINARY:
+        return {"msg_type": message.msg_type,
+                "bin_type": int(message.bin_type),
+                "size": len(message.payload)}
+    if message.msg_type in (HiveMessageType.BUS, HiveMessageType.SHARED_BUS):
+        return {"msg_type": message.msg_type, "data": _shallow_copy(message["data"])}
+    return {"msg_type": message.msg_type, "payload": _shallow_copy(message.payload)}
+
+
+def format_summary(summary: dict) -> dict:
+    """JSON safe form of a summary, data is written as a bounded repr"""
+    return {key: _SNAPSHOT.repr(value) if key in ("data", "payload") else value
+            for key, value in summary.items()}
+
+
+class BusTracer:
+    """Ring buffer of the last sampled messages of a connection
+
+    recording keeps a shallow copy of the message data instead of the message itself, so the
+    buffer never holds binary payloads, formatting happens when the buffer is dumped or when
+    debug logging is enabled for this module.
+    Disabled tracers cost a single attribute check per message
+    """
+
+    def __init__(self, size: int = DEFAULT_TRACE_SIZE):
+        self.enabled = False
+        self.sample_rate = 1.0  # fraction of messages kept for types without their own rate
+        self.sample_rates: Dict[str, float] = {}
+        self.sampled = 0
+        self.skipped = 0
+        self._buffer = deque(maxlen=size)
+
+    def configure(self, enabled: bool, size: Optional[int] = None, sample_rate: Optional[float] = None,
+                  sample_rates: Optional[Dict[str, float]] = None):
+        if size is not None and size != self._buffer.maxlen:
+            self._buffer = deque(self._buffer, maxlen=size)
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if sample_rates is not None:
+            self.sample_rates = dict(sample_rates)
+        self.enabled = enabled
+
+    def record(self, direction: str, msg_type: str, message: HiveMessage):
+        rate = self.sample_rates.get(msg_type, self.sample_rate)
+        if rate < 1 and random.random() >= rate:
+            self.skipped += 1
+            return
+        self.sampled += 1
+        summary = message_summary(message)
+        self._buffer.append((time.time(), direction, msg_type, summary))
+        _LOGGER.debug("HiveMind %s %s: %s", direction, msg_type, summary)
+
+    def clear(self):
+        self._buffer.clear()
+
+    def entries(self) -> List[dict]:
+        """Format the buffered messages, oldest first"""
+        return [{"ts": round(ts, 6), "direction": direction, "type": msg_type,
+                 "message": format_summary(summary)}
+                for ts, direction, msg_type, summary in list(self._buffer)]
+
+    def dump(self, path: str) -> int:
+        """Write the buffered messages to a JSONL file, returns the number of entries written"""
+        entries = self.entries()
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json_dumps(entry) + "\n")
+        return len(entries)
+
+    def as_dict(self) -> dict:
+        return {"enabled": self.enabled,
+                "size": self._buffer.maxlen,
+                "buffered": len(self._buffer),
+                "sample_rate": self.sample_rate,
+                "sample_rates": self.sample_rates,
+                "sampled": self.sampled,
+                "skipped": self.skipped}
@@ -0,0 +1,43 @@
+"""Metadata of the tracks played by a HiveMind media player"""
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+TRACK_CACHE_SIZE = 256  # tracks remembered per player, least recently used are evicted
+
+
+class TrackMetadata(NamedTuple):
+    title: str = ""
+    artist: str = ""
+    album: str = ""
+    image: str = ""
+    length: int = 0
+
+
+class TrackCache:
+    """LRU cache of track metadata keyed by URI
+
+    fed from track_info responses and from the media entries queued by Home Assistant,
+    so a track that was seen before needs no metadata round trips when it plays again
+    """
+
+    def __init__(self, size: int = TRACK_CACHE_SIZE):
+        self.size = size
+        self._tracks: "OrderedDict[str, TrackMetadata]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def get(self, uri: str) -> Optional[TrackMetadata]:
+        track = self._tracks.get(uri)
+        if track is not None:
+            self._tracks.move_to_end(uri)
+        return track
+
+    def update(self, uri: str, **fields) -> TrackMetadata:
+        """Merge the non empty fields into the cached metadata of uri and return the result"""
+        track = self._tracks.pop(uri, None) or TrackMetadata()
+        track = track._replace(**{k: v for k, v in fields.items() if v})
+        self._tracks[uri] = track
+        while len(self._tracks) > self.size:
+            self._tracks.popitem(last=False)
+        return track
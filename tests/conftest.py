@@ -0,0 +1,38 @@
+"""Shared fixtures, the integration modules import without Home Assistant installed"""
+import importlib.util
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if importlib.util.find_spec("homeassistant") is None:
+    # the package __init__ sets up the Home Assistant integration, the modules holding
+    # the connection logic only need their own package to resolve relative imports
+    for name, path in (("custom_components", ("custom_components",)),
+                       ("custom_components.hivemind", ("custom_components", "hivemind"))):
+        if name not in sys.modules:
+            package = types.ModuleType(name)
+            package.__path__ = [os.path.join(ROOT, *path)]
+            sys.modules[name] = package
+
+
+@pytest.fixture
+def client(tmp_path):
+    """HiveMindClient that never connects, with a FakeBus as its local bus"""
+    pytest.importorskip("hivemind_bus_client")
+    from hivemind_bus_client.identity import NodeIdentity
+    from json_database import JsonStorage
+    from ovos_utils.fakebus import FakeBus
+
+    from custom_components.hivemind.client import HiveMindClient
+
+    ovos_bus = FakeBus()
+    ovos_bus.session_id = "default"
+    bus = HiveMindClient(key="key", password="password", host="ws://127.0.0.1", port=5678,
+                         internal_bus=ovos_bus,
+                         identity=NodeIdentity(JsonStorage(str(tmp_path / "identity.json"))))
+    yield bus
+    bus.shutdown(timeout=1)
@@ -0,0 +1,48 @@
+"""Satellite audio streamed into Assist"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant.components.assist_pipeline")
+
+from custom_components.hivemind import assist
+from custom_components.hivemind.assist import AUDIO_QUEUE_SIZE, AssistAudioBridge
+
+
+async def test_stalled_pipeline_drops_audio_without_blocking(monkeypatch):
+    loop = asyncio.get_running_loop()
+    streams = []
+
+    async def stalled_pipeline(self, stream):
+        streams.append(stream)
+
+    monkeypatch.setattr(AssistAudioBridge, "_run_pipeline", stalled_pipeline)
+    bridge = AssistAudioBridge(SimpleNamespace(loop=loop), bus=None)
+
+    def satellite():
+        for _ in range(AUDIO_QUEUE_SIZE + 10):
+            bridge.handle_audio(b"\0" * 320, {"stream_id": "utterance"})
+        bridge.handle_audio(b"", {"stream_id": "utterance", "end": True})
+
+    await asyncio.wait_for(loop.run_in_executor(None, satellite), 1)
+    await asyncio.sleep(0)
+
+    stream, = streams
+    assert stream.dropped == 10
+    assert stream.closed
+    assert bridge.active_streams == 0
+    # frames after the end do not start another run
+    bridge.handle_audio(b"\0" * 320, {"stream_id": "utterance"})
+    assert len(streams) == 1
+
+
+async def test_stream_ends_once_drained(monkeypatch):
+    monkeypatch.setattr(assist, "AUDIO_QUEUE_SIZE", 2)
+    stream = assist.AudioStream("utterance", {})
+    for chunk in (b"a", b"b", b"c"):
+        stream.put(chunk)
+    stream.close()
+
+    assert [chunk async for chunk in stream.chunks()] == [b"a", b"b"]
+    assert stream.dropped == 1
@@ -0,0 +1,38 @@
+"""Capture and replay of bus traffic"""
+import pytest
+
+pytest.importorskip("hivemind_bus_client")
+
+from hivemind_bus_client.message import HiveMessage, HiveMessageType
+from ovos_bus_client.message import Message
+
+from custom_components.hivemind.capture import CAPTURE_INBOUND, BusCapture, replay_capture
+from custom_components.hivemind.codec import json_loads
+
+
+def test_capture_snapshots_messages_when_recorded(tmp_path):
+    path = str(tmp_path / "capture.jsonl")
+    capture = BusCapture(path)
+    data = {"percent": 40}
+    capture.record(CAPTURE_INBOUND, HiveMessage(HiveMessageType.BUS,
+                                                payload=Message("mycroft.volume.get.response", data)))
+    data["percent"] = 90
+    capture.close()
+
+    with open(path, encoding="utf-8") as f:
+        (ts, direction, record), = [json_loads(line) for line in f]
+    assert direction == CAPTURE_INBOUND
+    assert record["payload"]["data"] == {"percent": 40}
+    assert capture.as_dict()["dropped"] == 0
+
+
+def test_replay_goes_through_the_inbound_path(tmp_path, client):
+    path = str(tmp_path / "capture.jsonl")
+    capture = BusCapture(path)
+    capture.record(CAPTURE_INBOUND, HiveMessage(HiveMessageType.BUS, payload=Message(
+        "mycroft.volume.get.response", {"percent": 40, "muted": False})))
+    capture.close()
+
+    assert replay_capture(path, client, speed=0) == 1
+    assert client.device_state["volume"] == 40
+    assert client.stats.messages_in["mycroft.volume.get.response"] == 1
@@ -0,0 +1,7 @@
+"""HiveMind connection construction"""
+
+
+def test_client_construction(client):
+    # registered by the library constructor before the integration attributes existed
+    assert client._handled_types["ovos.session.update_default"] == 1
+    assert not client.handshake_event.is_set()
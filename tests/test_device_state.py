@@ -0,0 +1,76 @@
+"""Device state shared by the entities of a HiveMind device"""
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from ovos_bus_client.message import Message
+
+
+def test_echoed_command_is_not_reported(client):
+    from hivemind_bus_client.message import HiveMessage, HiveMessageType
+    from hivemind_bus_client.serialization import HiveMindBinaryPayloadType
+
+    from custom_components.hivemind.outbound import OutboundItem, PRIORITY_CONTROL
+
+    state = client.device_state
+    state.restore(muted=False)
+    # what HiveMindMediaPlayer.async_mute_volume does, then the sender writes the command
+    state.set_optimistic(muted=True)
+    client.protocol = SimpleNamespace(binarize=False)
+    message = HiveMessage(HiveMessageType.BUS, payload=Message("mycroft.volume.mute"))
+    item = OutboundItem(message, HiveMindBinaryPayloadType.UNDEFINED, Future(), PRIORITY_CONTROL)
+    client.sender._frame(SimpleNamespace(get_mask_key=None), item)
+
+    assert state["muted"] is True
+    assert state.is_provisional(["muted"])
+    assert "muted" not in state._reported
+    assert "hivemind_echo" not in message["context"]
+
+    client.internal_bus.emit(Message("mycroft.volume.get.response", {"muted": True, "percent": 40}))
+    assert not state.is_provisional(["muted"])
+    assert "muted" in state._reported
+    assert state["volume"] == 40
+
+
+def device_state():
+    from custom_components.hivemind.device_state import DeviceState
+
+    handlers = {}
+    bus = SimpleNamespace(on_mycroft=lambda msg_type, handler: handlers.__setitem__(msg_type, handler))
+    return DeviceState(bus), handlers
+
+
+def test_restored_values_are_provisional_until_reported():
+    state, handlers = device_state()
+    changes = []
+    state.subscribe(["volume", "muted"], changes.append)
+
+    assert state.restore(volume=30, muted=True) == {"volume", "muted"}
+    assert state.is_provisional(["volume"])
+    # the same value confirmed by the device still notifies, the entity drops its provisional flag
+    handlers["mycroft.volume.get.response"](Message("mycroft.volume.get.response", {"muted": True, "percent": 30}))
+    assert not state.is_provisional(["volume", "muted"])
+    assert changes == [{"volume", "muted"}, {"volume", "muted"}]
+
+    # a reported field is never overwritten by a late restore
+    assert state.restore(volume=80) == set()
+    assert state["volume"] == 30
+
+
+def test_repeated_updates_notify_nobody():
+    state, handlers = device_state()
+    changes = []
+    state.subscribe(["ssh"], changes.append)
+    for _ in range(3):
+        handlers["system.ssh.enabled"](Message("system.ssh.enabled"))
+    assert changes == [{"ssh"}]
+    assert state.as_dict()["updates"] == 3
+    assert state.as_dict()["changes"] == 1
+
+
+def test_optimistic_values_are_not_reported():
+    state, handlers = device_state()
+    assert state.set_optimistic(sleeping=True) == {"sleeping"}
+    assert "sleeping" not in state._reported
+    handlers["recognizer_loop:awoken"](Message("recognizer_loop:awoken"))
+    assert state["sleeping"] is False
+    assert "sleeping" in state._reported
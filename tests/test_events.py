@@ -0,0 +1,54 @@
+"""Bus messages forwarded to the Home Assistant event bus"""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.hivemind import events
+from custom_components.hivemind.events import MessageTypeFilter, RateLimiter, parse_patterns
+
+
+def test_patterns_are_split_on_commas_and_whitespace():
+    assert parse_patterns("speak, mycroft.*\n  ovos.common_play.*") == ["speak", "mycroft.*", "ovos.common_play.*"]
+    assert parse_patterns("") == []
+    assert parse_patterns(None) == []
+
+
+def test_filter_matches_exact_prefix_and_glob():
+    type_filter = MessageTypeFilter(["speak", "mycroft.audio.*", "ovos.*.state", "recognizer_loop:?"])
+    assert type_filter.match("speak")
+    assert not type_filter.match("speak.response")
+    assert type_filter.match("mycroft.audio.service.play")
+    assert type_filter.match("mycroft.audio.")
+    assert not type_filter.match("mycroft.audi")
+    assert type_filter.match("ovos.common_play.player.state")
+    assert not type_filter.match("ovos.common_play.player.status")
+    assert type_filter.match("recognizer_loop:a")
+    assert not type_filter.match("recognizer_loop:utterance")
+
+
+def test_filter_matches_all_or_nothing():
+    assert MessageTypeFilter(["*"]).match("anything")
+    assert not MessageTypeFilter([])
+    assert not MessageTypeFilter([]).match("speak")
+
+
+def test_rate_limiter_refills_per_key(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(events, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    limiter = RateLimiter(rate=2, burst=2)
+    assert limiter.allow("speak")
+    assert limiter.allow("speak")
+    assert not limiter.allow("speak")
+    assert limiter.allow("mycroft.stop")
+    assert limiter.dropped == {"speak": 1}
+
+    clock.now += 0.5
+    assert limiter.allow("speak")
+    assert not limiter.allow("speak")
+
+
+def test_rate_limiter_disabled():
+    limiter = RateLimiter(rate=0)
+    assert all(limiter.allow("speak") for _ in range(100))
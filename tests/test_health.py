@@ -0,0 +1,52 @@
+"""Circuit breakers of the OVOS service health probes"""
+from custom_components.hivemind.health import MAX_PROBE_BACKOFF, PROBE_BACKOFF, PROBE_FAILURES, HealthBreakers
+
+
+class RecordedState:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, **fields):
+        self.updates.append(fields)
+
+
+def test_unanswered_probes_open_the_breaker():
+    state = RecordedState()
+    breakers = HealthBreakers(state)
+    # the last probe may still be answered
+    for _ in range(PROBE_FAILURES):
+        breakers.sent("mycroft.gui_service.is_alive")
+    assert not breakers.breakers["gui_service"].open
+
+    breakers.sent("mycroft.gui_service.is_alive")
+    assert breakers.breakers["gui_service"].open
+    assert state.updates == [{"missing:gui_service": True}]
+    assert breakers.interval("gui_service") == PROBE_BACKOFF
+
+    for _ in range(20):
+        breakers.sent("mycroft.gui_service.is_ready")
+    assert breakers.interval("gui_service") == MAX_PROBE_BACKOFF
+    assert state.updates == [{"missing:gui_service": True}]
+
+
+def test_any_message_of_the_service_closes_the_breaker():
+    state = RecordedState()
+    breakers = HealthBreakers(state)
+    for _ in range(PROBE_FAILURES + 1):
+        breakers.sent("mycroft.audio.is_alive")
+    breakers.received("mycroft.skills.initialized")
+    assert breakers.breakers["audio"].open
+
+    breakers.received("ovos.common_play.player.state")
+    assert not breakers.breakers["audio"].open
+    assert state.updates == [{"missing:audio": True}, {"missing:audio": False}]
+    assert breakers.as_dict()["audio"] == {"failures": 0, "open": False, "interval": None}
+
+
+def test_answered_probes_never_report():
+    state = RecordedState()
+    breakers = HealthBreakers(state)
+    for _ in range(PROBE_FAILURES * 3):
+        breakers.sent("mycroft.voice.is_ready")
+        breakers.received("mycroft.voice.is_ready.response")
+    assert not state.updates
@@ -0,0 +1,74 @@
+"""Config entry setup, unload and reload"""
+import threading
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+conversation = pytest.importorskip("homeassistant.components.conversation")
+if not hasattr(conversation, "ConversationEntity"):
+    pytest.skip("the conversation platform needs a newer Home Assistant", allow_module_level=True)
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components import hivemind
+from custom_components.hivemind.client import HiveMindClient
+from custom_components.hivemind.const import DOMAIN
+
+ENTRY_DATA = {"name": "Mark 2", "access_key": "key", "password": "password", "site_id": "kitchen",
+              "host": "ws://127.0.0.1", "port": 5678, "allow_self_signed": False, "legacy_audio": False}
+
+
+@pytest.fixture(autouse=True)
+def no_connection(enable_custom_integrations, monkeypatch):
+    """Never open the websocket, the handshake just does not complete"""
+    monkeypatch.setattr(HiveMindClient, "connect", lambda self, *args, **kwargs: None)
+    # starts a process wide config file watcher thread
+    monkeypatch.setattr(hivemind, "init_service_logger", lambda name: None)
+
+
+def hivemind_threads() -> list:
+    return [t for t in threading.enumerate() if t.name.startswith("hivemind-")]
+
+
+async def setup_entry(hass) -> MockConfigEntry:
+    entry = MockConfigEntry(domain=DOMAIN, data=ENTRY_DATA, version=0)
+    entry.add_to_hass(hass)
+    # exposed entities used by assist_pipeline
+    assert await async_setup_component(hass, "homeassistant", {})
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_reload_releases_the_connection(hass):
+    entry = await setup_entry(hass)
+    assert entry.state is ConfigEntryState.LOADED
+    threads = len(hivemind_threads())
+
+    for _ in range(5):
+        bus = entry.hm_bus
+        assert await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+        assert entry.state is ConfigEntryState.LOADED
+        assert entry.hm_bus is not bus
+        assert not bus.bus_listeners and not bus.handshake_listeners and not bus._handlers
+        assert len(hivemind_threads()) == threads
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.NOT_LOADED
+    assert not hasattr(entry, "hm_bus")
+    assert not hivemind_threads()
+
+
+async def test_failed_setup_releases_the_connection(hass, monkeypatch):
+    def refuse(self, *args, **kwargs):
+        raise ConnectionRefusedError("hub is down")
+
+    monkeypatch.setattr(HiveMindClient, "connect", refuse)
+    entry = await setup_entry(hass)
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+    assert not hasattr(entry, "hm_bus")
+    assert not hivemind_threads()
@@ -0,0 +1,59 @@
+"""Latency of commands confirmed by the device"""
+from types import SimpleNamespace
+
+from ovos_utils.ocp import PlayerState
+
+from custom_components.hivemind import latency
+from custom_components.hivemind.latency import CONFIRM_TIMEOUT, CommandLatency
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_confirmation_is_timed(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(latency, "time", SimpleNamespace(monotonic=clock.monotonic))
+    commands = CommandLatency()
+    notified = []
+    commands.listeners.append(lambda: notified.append(True))
+
+    commands.sent("ovos.common_play.pause")
+    clock.now += 0.5
+    # a state the command did not ask for confirms nothing
+    commands.received("ovos.common_play.player.state", {"state": PlayerState.PLAYING})
+    assert not notified
+    clock.now += 0.25
+    commands.received("ovos.common_play.player.state", {"state": PlayerState.PAUSED})
+
+    assert notified == [True]
+    assert commands.as_dict() == {"ovos.common_play.pause": {
+        "confirmed": 1, "failures": 0, "last": 0.75, "mean": 0.75, "max": 0.75}}
+
+
+def test_unconfirmed_command_expires(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(latency, "time", SimpleNamespace(monotonic=clock.monotonic))
+    commands = CommandLatency()
+    commands.sent("mycroft.volume.mute")
+    commands.expire()
+    assert not commands.failures
+
+    clock.now += CONFIRM_TIMEOUT + 1
+    commands.expire()
+    assert commands.failures == {"mycroft.volume.mute": 1}
+    # the late confirmation is not timed
+    commands.received("mycroft.volume.mute", {})
+    assert commands.as_dict()["mycroft.volume.mute"]["confirmed"] == 0
+
+
+def test_unknown_commands_are_ignored():
+    commands = CommandLatency()
+    commands.sent("speak")
+    commands.received("speak", {})
+    commands.expire()
+    assert commands.as_dict() == {}
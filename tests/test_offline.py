@@ -0,0 +1,51 @@
+"""Commands held while a device is disconnected"""
+from types import SimpleNamespace
+
+from custom_components.hivemind import offline
+from custom_components.hivemind.offline import OfflineQueue
+
+
+def test_volume_steps_are_not_coalesced():
+    queue = OfflineQueue()
+    for n in range(3):
+        assert queue.hold("mycroft.volume.increase", f"up{n}") == (True, [])
+    queue.hold("mycroft.volume.decrease", "down")
+    items, expired = queue.flush()
+    assert items == ["up0", "up1", "up2", "down"]
+    assert queue.coalesced == 0
+
+
+def test_set_commands_keep_only_the_last_one():
+    queue = OfflineQueue()
+    queue.hold("mycroft.volume.set", "set50")
+    queue.hold("mycroft.volume.increase", "up")
+    assert queue.hold("mycroft.volume.set", "set30") == (True, ["set50"])
+    assert queue.flush() == (["up", "set30"], [])
+    assert queue.coalesced == 1
+
+
+def test_expired_commands_are_not_sent(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(offline, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    queue = OfflineQueue()
+    queue.hold("mycroft.stop", "stop")
+    queue.hold("mycroft.volume.mute", "mute")
+    clock.now += 10
+    assert queue.flush() == (["mute"], ["stop"])
+    assert queue.expired == 1
+    assert not len(queue)
+
+
+def test_queries_are_never_held():
+    queue = OfflineQueue()
+    assert queue.hold("mycroft.volume.get", "get") == (False, [])
+    assert not len(queue)
+
+
+def test_oldest_command_is_dropped_when_full():
+    queue = OfflineQueue(size=2)
+    queue.hold("speak", "first")
+    queue.hold("speak", "second")
+    assert queue.hold("speak", "third") == (True, ["first"])
+    assert queue.flush() == (["second", "third"], [])
+    assert queue.as_dict() == {"held": 0, "coalesced": 0, "expired": 0, "dropped": 1}
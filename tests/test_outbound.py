@@ -0,0 +1,78 @@
+"""Outbound priority lanes"""
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("hivemind_bus_client")
+
+from custom_components.hivemind.outbound import (OutboundItem, PriorityLanes, PRIORITY_BULK,
+                                                 PRIORITY_CONTROL, PRIORITY_TTS, STARVATION_LIMIT)
+
+
+def item(name: str, priority: int) -> OutboundItem:
+    return OutboundItem(name, None, Future(), priority)
+
+
+def names(items) -> list:
+    return [i.message for i in items]
+
+
+def test_higher_lanes_first_fifo_within_a_lane():
+    lanes = PriorityLanes()
+    for i in (item("bulk1", PRIORITY_BULK), item("tts1", PRIORITY_TTS), item("control1", PRIORITY_CONTROL),
+              item("bulk2", PRIORITY_BULK), item("control2", PRIORITY_CONTROL)):
+        lanes.put(i)
+    assert names(lanes.get_batch(32)) == ["control1", "control2"]
+    assert names(lanes.get_batch(32)) == ["tts1"]
+    assert names(lanes.get_batch(32)) == ["bulk1", "bulk2"]
+    assert len(lanes) == 0
+
+
+def test_batches_hold_one_lane_and_respect_max_items():
+    lanes = PriorityLanes()
+    for n in range(5):
+        lanes.put(item(f"bulk{n}", PRIORITY_BULK))
+    assert names(lanes.get_batch(2)) == ["bulk0", "bulk1"]
+    lanes.put(item("control", PRIORITY_CONTROL))
+    # queued after a bulk batch was taken, served before the rest of the bulk lane
+    assert names(lanes.get_batch(32)) == ["control"]
+    assert names(lanes.get_batch(32)) == ["bulk2", "bulk3", "bulk4"]
+
+
+def test_starved_lane_is_served():
+    lanes = PriorityLanes()
+    lanes.put(item("bulk", PRIORITY_BULK))
+    for n in range(STARVATION_LIMIT + 2):
+        lanes.put(item(f"control{n}", PRIORITY_CONTROL))
+    # the batch stops where the bulk lane starved
+    assert names(lanes.get_batch(32)) == [f"control{n}" for n in range(STARVATION_LIMIT)]
+    assert names(lanes.get_batch(32)) == ["bulk"]
+    assert lanes.starvation_grants == 1
+    assert names(lanes.get_batch(32)) == [f"control{n}" for n in range(STARVATION_LIMIT, STARVATION_LIMIT + 2)]
+
+
+def test_close_returns_unsent_items_and_wakes_consumers():
+    lanes = PriorityLanes()
+    lanes.put(item("tts", PRIORITY_TTS))
+    assert names(lanes.close()) == ["tts"]
+    assert lanes.get_batch(32) == []
+
+
+def test_batch_taken_before_a_disconnect_is_held_like_offline_commands(client, monkeypatch):
+    from threading import Timer
+
+    from hivemind_bus_client.message import HiveMessage, HiveMessageType
+    from ovos_bus_client.message import Message
+
+    from custom_components.hivemind import outbound
+
+    monkeypatch.setattr(outbound, "CONNECT_POLL_INTERVAL", 0.05)
+    query, command = [OutboundItem(HiveMessage(HiveMessageType.BUS, payload=Message(msg_type)),
+                                   None, Future(), PRIORITY_CONTROL)
+                      for msg_type in ("mycroft.volume.get", "mycroft.volume.set")]
+    for i in (query, command):
+        i.future.set_running_or_notify_cancel()
+    Timer(0.2, client.handshake_event.set).start()
+
+    assert client.sender._wait_connected([query, command]) == [command]
+    assert isinstance(query.future.exception(0), ConnectionError)
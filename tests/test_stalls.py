@@ -0,0 +1,36 @@
+"""Stall detection of entity commands"""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.hivemind.entity import HiveMindEntity
+from custom_components.hivemind.stalls import StallDetector
+
+
+class Switch(HiveMindEntity):
+    def poll_messages(self):
+        return []
+
+    def restored_fields(self, state):
+        return {}
+
+    async def async_turn_on(self, **kwargs):
+        pass
+
+    def press(self):
+        pass
+
+
+async def test_only_commands_are_instrumented():
+    detector = StallDetector(threshold=1)
+    switch = Switch(SimpleNamespace(stats=SimpleNamespace(stalls=detector)), "kitchen", "Mark 2")
+    switch.entity_id = "switch.mark_2"
+    assert set(vars(switch)) >= {"async_turn_on", "press"}
+    assert not {"poll_messages", "restored_fields", "async_added_to_hass"} & set(vars(switch))
+
+    await switch.async_turn_on()
+    switch.press()
+    switch.poll_messages()
+    assert set(detector.histograms) == {"command:switch.mark_2.async_turn_on", "command:switch.mark_2.press"}
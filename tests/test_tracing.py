@@ -0,0 +1,32 @@
+"""Sampled tracing of bus traffic"""
+import pytest
+
+pytest.importorskip("hivemind_bus_client")
+
+from hivemind_bus_client.message import HiveMessage, HiveMessageType
+from hivemind_bus_client.serialization import HiveMindBinaryPayloadType
+from ovos_bus_client.message import Message
+
+from custom_components.hivemind.tracing import BusTracer
+
+
+def test_records_a_snapshot_formatted_on_dump(tmp_path):
+    tracer = BusTracer()
+    data = {"utterance": "x" * 500, "lang": "en-us"}
+    tracer.record("out", "speak", HiveMessage(HiveMessageType.BUS, payload=Message("speak", data)))
+    data["lang"] = "pt-pt"
+
+    entry, = tracer.entries()
+    assert entry["type"] == "speak"
+    assert "en-us" in entry["message"]["data"]
+    assert len(entry["message"]["data"]) < 200
+    assert tracer.dump(str(tmp_path / "trace.jsonl")) == 1
+
+
+def test_binary_payloads_are_reduced_to_their_size():
+    tracer = BusTracer()
+    tracer.record("in", "bin", HiveMessage(HiveMessageType.BINARY, payload=b"\0" * 65536,
+                                           bin_type=HiveMindBinaryPayloadType.RAW_AUDIO))
+    entry, = tracer.entries()
+    assert entry["message"]["size"] == 65536
+    assert "data" not in entry["message"]
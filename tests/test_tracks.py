@@ -0,0 +1,22 @@
+"""Track metadata cache of the media player"""
+from custom_components.hivemind.tracks import TrackCache, TrackMetadata
+
+
+def test_update_merges_non_empty_fields():
+    cache = TrackCache()
+    cache.update("file:///a.mp3", title="Song", length=120)
+    track = cache.update("file:///a.mp3", title="", artist="Band")
+    assert track == TrackMetadata(title="Song", artist="Band", length=120)
+    assert cache.get("file:///a.mp3") == track
+    assert cache.get("file:///b.mp3") is None
+
+
+def test_least_recently_used_is_evicted():
+    cache = TrackCache(size=2)
+    cache.update("a", title="A")
+    cache.update("b", title="B")
+    cache.get("a")
+    cache.update("c", title="C")
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a").title == "A"